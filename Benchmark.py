@@ -0,0 +1,356 @@
+#===============================================================================================
+# Benchmark Functions
+#===============================================================================================
+
+# Times the DataExtracter and PlotFxns functions on synthetic feather board and DMA logs so a
+# change can be checked for speed against a stored baseline.
+#
+# Use as:
+#   python Benchmark.py --sizes 10000 100000 --out results.json
+#   python Benchmark.py --sizes 10000 100000 --baseline results.json --out new.json
+
+# Imported Libraries
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import traceback
+import numpy as np
+import pandas as pd
+
+import DataExtracter as DE
+import PlotFxns as PF
+
+BenchSizes = (10_000, 100_000, 1_000_000, 10_000_000, 50_000_000)   # Supported log sizes [rows]
+BenchGroups = ('extract', 'process', 'plot')
+BenchBlock = 1_000_000          # Rows generated per block (fixed so the output only depends on the seed)
+BenchVersion = 1                # Bump when the generators change, so cached logs are regenerated
+BasePath = os.path.join(tempfile.gettempdir(), "DataExtracter-bench")
+
+#===============================================================================================
+# Data Generators
+#===============================================================================================
+
+def Bench_FeatherLog(filepath,n_rows,seed=0,dt=10,dur_cycle=10.0):
+    """
+    This FUNCTION writes a deterministic synthetic feather board log: a header row, n_rows rows of
+    time in [ms] and 4 resistance channels responding to a cyclic load with drift and noise, and a
+    last row cut mid line as when logging is stopped.
+
+    INPUT:
+        filepath (script)       ->      File path the log is written to
+        n_rows (Int)            ->      Number of complete data rows
+        seed (Int)              ->      Random seed (same seed and size = same file)
+        dt (Int)                ->      Sample period in [ms]
+        dur_cycle (Float)       ->      Duration of each load cycle in [s]
+    """
+    rng = np.random.default_rng(seed)
+    base = np.array([210.0, 120.0, 60.0, 55.0])     # Resting resistance of each channel [ohm]
+    amp = np.array([40.0, 25.0, 12.0, 10.0])         # Cyclic response of each channel [ohm]
+
+    with open(filepath, 'w', newline='') as f:
+        f.write("time,r1,r2,r3,r4\n")
+        for start in range(0, n_rows + 1, BenchBlock):
+            n = min(BenchBlock, n_rows + 1 - start)     # One extra row, written cut off below
+            i = np.arange(start, start + n)
+            t = i * dt + rng.integers(0, 2, n)          # Logger timing jitter of up to 1 ms
+            phase = np.sin(2*np.pi * t / (1000*dur_cycle))[:,None]
+            r = base + amp*phase + 1e-6*t[:,None] + rng.normal(0, 0.5, (n, 4))
+            block = pd.DataFrame(np.round(r, 3))
+            block.insert(0, 't', t)
+            if start + n > n_rows:                      # Last row of file is cut mid line
+                last = "%d,%.3f,%.3f,%.3f,%.3f" % tuple(block.iloc[-1])
+                block = block.iloc[:-1]
+            block.to_csv(f, header=False, index=False, lineterminator='\n')
+        f.write(last[:len(last)//2])
+
+def Bench_DMALog(filepath,n_rows,seed=0,dt=0.1,dur_cycle=10.0):
+    """
+    This FUNCTION writes a deterministic synthetic DMA export with the DMA's padded column names
+    and a cyclic compressive load (negative force) with matching displacement.
+
+    INPUT:
+        filepath (script)       ->      File path the export is written to
+        n_rows (Int)            ->      Number of data rows
+        seed (Int)              ->      Random seed (same seed and size = same file)
+        dt (Float)              ->      Sample period in [s]
+        dur_cycle (Float)       ->      Duration of each load cycle in [s]
+    """
+    rng = np.random.default_rng(seed + 1)
+
+    with open(filepath, 'w', newline='') as f:
+        f.write("Points,Elapsed Time ,Scan Time ,Disp     ,Load   ,Temp  \n")
+        for start in range(0, n_rows, BenchBlock):
+            n = min(BenchBlock, n_rows - start)
+            i = np.arange(start, start + n)
+            t = np.round(i * dt, 4)
+            phase = 0.5 - 0.5*np.cos(2*np.pi * t / dur_cycle)
+            block = pd.DataFrame({'Points': i,
+                                  'Elapsed Time ': t,
+                                  'Scan Time ': np.round(t % dur_cycle, 4),
+                                  'Disp     ': np.round(1.0 + 0.2*phase + rng.normal(0, 1e-4, n), 6),
+                                  'Load   ': np.round(-(5.0 + 245.0*phase) + rng.normal(0, 0.05, n), 4),
+                                  'Temp  ': np.round(25.0 + rng.normal(0, 0.01, n), 3)})
+            block.to_csv(f, header=False, index=False, lineterminator='\n')
+
+def Bench_Data(n_rows,seed=0,datadir=BasePath):
+    """
+    This FUNCTION returns the paths of the synthetic feather log and DMA export for a size, only
+    generating them when they are not already in datadir.
+
+    OUTPUT:
+        feather (script)        ->      File path of the feather board log
+        dma (script)            ->      File path of the DMA export
+    """
+    os.makedirs(datadir, exist_ok=True)
+    feather = os.path.join(datadir, "feather_v%d_n%d_s%d.txt" % (BenchVersion, n_rows, seed))
+    dma = os.path.join(datadir, "dma_v%d_n%d_s%d.csv" % (BenchVersion, n_rows, seed))
+
+    for path, generate in ((feather, Bench_FeatherLog), (dma, Bench_DMALog)):
+        if not os.path.exists(path):
+            with DE.File_Atomic(path) as tmppath:
+                generate(tmppath, n_rows, seed)
+
+    return feather, dma
+
+#===============================================================================================
+# Benchmark Cases
+#===============================================================================================
+
+def Bench_Time(func,repeat=3):
+    """
+    This FUNCTION runs func repeat times and returns the run times in [s], or the error raised.
+    """
+    times = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            return times, traceback.format_exc()
+        times.append(time.perf_counter() - t0)
+    return times, None
+
+def _Bench_Consume(blocks):
+    for block in blocks:
+        pass
+
+def Bench_Cases(feather,dma,savepath,stylepath=PF.BaseStylePath,groups=BenchGroups,dur_cycle=10.0):
+    """
+    This FUNCTION builds the benchmark cases for one pair of logs.
+
+    INPUT:
+        feather (script)        ->      File path of the feather board log
+        dma (script)            ->      File path of the DMA export
+        savepath (script)       ->      Directory plots are saved under
+        stylepath (script)      ->      Style file used by the plot cases
+        groups (List)           ->      Case groups to build ('extract', 'process', 'plot')
+        dur_cycle (Float)       ->      Duration of each load cycle in [s]
+
+    OUTPUT:
+        cases (List)            ->      (group, name, function) per case
+    """
+    cases = []
+
+    if 'extract' in groups:
+        cases += [('extract', 'Feather_BulkParse',      lambda: DE.Feather_BulkParse(feather)),
+                  ('extract', 'Feather_DataExtract',    lambda: DE.Feather_DataExtract(feather, 1)),
+                  ('extract', 'B1Feather_DataExtract',  lambda: DE.B1Feather_DataExtract(feather)),
+                  ('extract', 'B2Feather_DataExtract',  lambda: DE.B2Feather_DataExtract(feather)),
+                  ('extract', 'Feather_StreamExtract',  lambda: _Bench_Consume(DE.Feather_StreamExtract(feather, 1))),
+                  ('extract', 'DMA_Extract_TF',         lambda: DE.DMA_Extract_TF(dma)),
+                  ('extract', 'DMA_Extract_TFD',        lambda: DE.DMA_Extract_TFD(dma)),
+                  ('extract', 'DMA_FastExtract',        lambda: DE.DMA_FastExtract(dma))]
+
+    if 'process' not in groups and 'plot' not in groups:
+        return cases
+
+    data = DE.Feather_DataExtract(feather, 1)
+    duration = data[-1,0] - data[0,0]
+    cyclecount = max(int(duration // dur_cycle), 1)
+
+    if 'process' in groups:
+        cases += [('process', 'Feather_timefilter',     lambda: DE.Feather_timefilter(data, 0.0, duration/2)),
+                  ('process', 'Feather_cyclecut',       lambda: DE.Feather_cyclecut(data, 0.0, dur_cycle, cyclecount)),
+                  ('process', 'Feather_DeltaConvert',   lambda: DE.Feather_DeltaConvert(data))]
+
+    if 'plot' in groups:
+        PF.matplotlib.use('Agg')
+        tfd = DE.DMA_Extract_TFD(dma)
+        stime, resist, force = DE.Feather_DMA_Sync(data, tfd, 1, base='feather')
+        cycles = DE.Feather_cyclecut(data, 0.0, dur_cycle, min(cyclecount, 12))
+        rdata = {s: data for s in range(3)}
+        dmadata = {s: tfd for s in range(3)}
+        testparam = {s: [1, 0.0, dur_cycle, cyclecount, True, ""] for s in range(3)}
+        ftime, fdata = tfd['Elapsed Time '].to_numpy(), tfd['Load   '].to_numpy()
+        kw = {'stylepath': stylepath}
+        # FvD_comb_plot is left out: it reads undefined rdata / ftime / fdata and always raises
+
+        cases += [('plot', 'RvT_raw_plot',          lambda: PF.RvT_raw_plot(data[:,0], data[:,1], 1, "B", savepath, **kw)),
+                  ('plot', 'RvT_delta_plot',        lambda: PF.RvT_delta_plot(data[:,0], data[:,1], "B", savepath, **kw)),
+                  ('plot', 'RvT_tfil_plot',         lambda: PF.RvT_tfil_plot(data[:,0], data[:,1], "B", savepath, **kw)),
+                  ('plot', 'RvT_cycle_plot',        lambda: PF.RvT_cycle_plot(cycles, 1, "B", savepath, **kw)),
+                  ('plot', 'RvT_comb_plot',         lambda: PF.RvT_comb_plot(rdata, testparam, savepath, **kw)),
+                  ('plot', 'RvT_combdelta_plot',    lambda: PF.RvT_combdelta_plot(rdata, testparam, savepath, **kw)),
+                  ('plot', 'RvT_combraw_plot',      lambda: PF.RvT_combraw_plot(rdata, testparam, savepath, **kw)),
+                  ('plot', 'RvFvT_raw_plot',        lambda: PF.RvFvT_raw_plot(data[:,0], data[:,1], ftime, fdata, "B", savepath, **kw)),
+                  ('plot', 'RvFvT_delta_plot',      lambda: PF.RvFvT_delta_plot(data[:,0], data[:,1], ftime, fdata, "B", savepath, **kw)),
+                  ('plot', 'RvFvT_comb_plot',       lambda: PF.RvFvT_comb_plot(rdata, ftime, fdata, testparam, savepath, **kw)),
+                  ('plot', 'RvF_plot',              lambda: PF.RvF_plot(force, resist, "B", savepath, **kw)),
+                  ('plot', 'FvD_plot',              lambda: PF.FvD_plot(tfd['Disp     '], tfd['Load   '], "B", savepath, **kw)),
+                  ('plot', 'DvT_plot',              lambda: PF.DvT_plot(ftime, tfd['Disp     '], "B", savepath, **kw)),
+                  ('plot', 'FvDvT_comb_plot',       lambda: PF.FvDvT_comb_plot(dmadata, savepath, **kw))]
+
+    return cases
+
+#===============================================================================================
+# Benchmark Runs
+#===============================================================================================
+
+def Bench_Run(sizes=BenchSizes[:3],groups=BenchGroups,repeat=3,seed=0,datadir=BasePath,stylepath=PF.BaseStylePath,log=print):
+    """
+    This FUNCTION generates (or reuses) the synthetic logs for each size and times every case on them.
+    A case that raises is recorded with its error and does not stop the run.
+
+    INPUT:
+        sizes (List)            ->      Log sizes in [rows]
+        groups (List)           ->      Case groups to run ('extract', 'process', 'plot')
+        repeat (Int)            ->      Number of timed runs per case (best is compared)
+        seed (Int)              ->      Random seed of the generators
+        datadir (script)        ->      Directory the synthetic logs and plots are kept in
+        stylepath (script)      ->      Style file used by the plot cases
+        log (Function)          ->      Called with a progress line per case (None = quiet)
+
+    OUTPUT:
+        results (Dictionary)    ->      Machine readable results (see Bench_Save)
+                                            'meta'    = versions and platform of the run
+                                            'results' = one dictionary per case with
+                                                        'group', 'name', 'rows', 'times' [s],
+                                                        'best' [s], 'median' [s], 'error'
+    """
+    savepath = os.path.join(datadir, "plots")
+    results = []
+
+    for n_rows in sizes:
+        feather, dma = Bench_Data(n_rows, seed, datadir)
+        for group, name, func in Bench_Cases(feather, dma, savepath, stylepath, groups):
+            times, error = Bench_Time(func, repeat)
+            if group == 'plot':
+                PF._Plot_Cleanup()
+            results.append({'group': group, 'name': name, 'rows': n_rows, 'times': times,
+                            'best': min(times) if times else None,
+                            'median': float(np.median(times)) if times else None,
+                            'error': error})
+            if log is not None:
+                log("%-8s %-24s %10d rows  %s" % (group, name, n_rows,
+                    "%.4f s" % min(times) if error is None else "ERROR " + error.strip().splitlines()[-1]))
+
+    return {'meta': Bench_Meta(seed, repeat), 'results': results}
+
+def Bench_Meta(seed=0,repeat=3):
+    """
+    This FUNCTION returns the versions and platform a run was made on.
+    """
+    return {'version': BenchVersion,
+            'date': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'csv_engine': DE.DMA_CSVEngine,
+            'seed': seed,
+            'repeat': repeat}
+
+def Bench_Save(results,filepath):
+    """
+    This FUNCTION writes benchmark results to a JSON file.
+    """
+    with open(filepath, 'w') as f:
+        json.dump(results, f, indent=2)
+
+def Bench_Load(filepath):
+    """
+    This FUNCTION reads benchmark results from a JSON file.
+    """
+    with open(filepath) as f:
+        return json.load(f)
+
+def Bench_Compare(results,baseline,tolerance=0.10):
+    """
+    This FUNCTION compares the best time of each case with the same case (name and size) in a baseline.
+
+    INPUT:
+        results (Dictionary)    ->      Results of this run (see Bench_Run)
+        baseline (Dictionary)   ->      Stored results to compare against
+        tolerance (Float)       ->      Relative change treated as noise
+
+    OUTPUT:
+        rows (List)             ->      One dictionary per case with
+                                            'name', 'rows', 'best' [s], 'baseline' [s],
+                                            'ratio'  = best / baseline
+                                            'status' = 'faster', 'slower', 'same', 'new' or 'error'
+    """
+    base = {(r['name'], r['rows']): r for r in baseline['results']}
+    rows = []
+
+    for r in results['results']:
+        b = base.get((r['name'], r['rows']))
+        row = {'name': r['name'], 'rows': r['rows'], 'best': r['best'], 'baseline': None, 'ratio': None}
+        if r['error'] is not None:
+            row['status'] = 'error'
+        elif b is None or b['best'] is None:
+            row['status'] = 'new'
+        else:
+            row['baseline'] = b['best']
+            row['ratio'] = r['best'] / b['best']
+            if row['ratio'] > 1 + tolerance:
+                row['status'] = 'slower'
+            elif row['ratio'] < 1 / (1 + tolerance):
+                row['status'] = 'faster'
+            else:
+                row['status'] = 'same'
+        rows.append(row)
+
+    return rows
+
+def Bench_Table(rows):
+    """
+    This FUNCTION formats the output of Bench_Compare as a text table.
+    """
+    lines = ["%-24s %10s %10s %10s %7s  %s" % ("Case", "Rows", "Best [s]", "Base [s]", "Ratio", "Status")]
+    for r in rows:
+        lines.append("%-24s %10d %10s %10s %7s  %s" % (r['name'], r['rows'],
+                     "-" if r['best'] is None else "%.4f" % r['best'],
+                     "-" if r['baseline'] is None else "%.4f" % r['baseline'],
+                     "-" if r['ratio'] is None else "%.2f" % r['ratio'],
+                     r['status']))
+    return "\n".join(lines)
+
+#-----------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time DataExtracter and PlotFxns on synthetic logs.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(BenchSizes[:3]),
+                        help="log sizes in rows (up to %d)" % BenchSizes[-1])
+    parser.add_argument('--groups', nargs='+', default=list(BenchGroups), choices=BenchGroups)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data', default=BasePath, help="directory for generated logs and plots")
+    parser.add_argument('--style', default=PF.BaseStylePath, help="matplotlib style file for the plot cases")
+    parser.add_argument('--out', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="compare against results stored in this JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = Bench_Run(args.sizes, args.groups, args.repeat, args.seed, args.data, args.style)
+    if args.out:
+        Bench_Save(results, args.out)
+
+    if args.baseline:
+        rows = Bench_Compare(results, Bench_Load(args.baseline), args.tolerance)
+        print(Bench_Table(rows))
+        sys.exit(1 if any(r['status'] == 'slower' for r in rows) else 0)
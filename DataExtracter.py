@@ -3,13 +3,290 @@
 #===============================================================================================
 
 # Imported Libraries
+import collections.abc
+import concurrent.futures
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import numbers
+import os
+import re
 import numpy as np
 import pandas as pd
 
+from Profiling import Profile_Staged    # Opt-in stage timing (see Profiling.py)
+
+# Optional faster CSV engine for DMA exports
+DMA_CSVEngine = 'pyarrow' if importlib.util.find_spec("pyarrow") is not None else 'c'
+
+# Feather board calibration registry (see Feather_LoadCalibration)
+BaseCalibrationPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "FeatherCalibration.json")
+_CalibrationRegistry = {}   # Loaded calibration configs, keyed by config file path
+
+# Parsed run cache (see Cache_Load / Cache_Store)
+BaseCachePath = os.path.join(os.path.expanduser("~"), ".cache", "DataExtracter")
+CacheMaxBytes = 20 * 1024**3    # Total size of cache directory before least recently used runs are evicted
+
+# Campaign directory scan (see Campaign_Manifest): "S<n>" / "B<n>" as a separate part of a file name
+CampaignField = r'(?:^|[_\-. ])%s(\d+)(?=[_\-. ]|$)'
+
 #===============================================================================================
 # Extraction Functions
 #===============================================================================================
 
+@Profile_Staged
+def Feather_BulkParse(filepath):
+    """
+    This FUNCTION parses a raw feather board CSV log into a float array in a few bulk operations
+    rather than line by line. Matches the line-by-line extractors: the header row and the last
+    row (which may be cut mid line) are dropped, and time is converted from [ms] to [s].
+    No calibration is applied.
+
+    INPUT:
+        filepath (script)       ->      Raw Script of filepath of text file
+                                                Value:  File path of the file to be processed
+
+    OUTPUT:
+        data_out (Array)        ->      Array containing uncalibrated data from file
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #
+    """
+    n_ch = 5                                    # Number of channels
+
+    with open(filepath,'rb') as f:
+        raw = f.read()                          # Import whole file in one read
+
+    # Locate the body of the file between the header row and the last row
+    start = raw.find(b'\n') + 1                 # First byte after the header row
+    if raw.endswith(b'\n'):
+        end = raw.rfind(b'\n', 0, len(raw)-1) + 1   # Last row is complete, but is still deleted
+    else:
+        end = raw.rfind(b'\n') + 1              # Last row was cut mid line
+    if start == 0 or end <= start:
+        return np.zeros([0,n_ch])               # No data rows in file
+
+    return _Feather_ParseRows(raw[start:end])
+
+#-----------------------------------------------------------------------------------------------
+
+def _Feather_ParseRows(raw):
+    """
+    This FUNCTION parses complete feather board CSV rows (bytes, no header) in one call to the
+    pandas C parser and converts time from [ms] to [s].
+    """
+    n_ch = 5                                    # Number of channels
+    
+    data_out = pd.read_csv(io.BytesIO(raw),
+                           header=None,
+                           usecols=range(n_ch),
+                           dtype=np.float64).to_numpy()
+    data_out[:,0] /= 1000                       # Channel 0 - Time [ms] -> [s]
+
+    return data_out
+
+#-----------------------------------------------------------------------------------------------
+
+def Feather_LoadCalibration(calibpath=BaseCalibrationPath):
+    """
+    This FUNCTION loads the feather board calibration registry from a JSON config file. Each board
+    stores the polynomial coefficients (highest power first, as used by np.polyval) for each of its
+    resistance channels. Channels missing from a board are left uncalibrated. The registry is
+    cached per config file so repeated extractions do not re-read it (until the file is modified).
+
+    INPUT:
+        calibpath (script)      ->      Raw Script of filepath of calibration config file
+                                                Value:  {"version": v, "boards": {board: {ch: [coeffs]}}}
+
+    OUTPUT:
+        registry (Dictionary)   ->      Dictionary containing calibration of each board
+                                            Key:    'version'   -> Calibration version
+                                                    'boards'    -> {board: {ch: coeffs array}}
+    """
+    calibpath = os.path.abspath(calibpath)
+    stat = os.stat(calibpath)
+    state = (stat.st_size, stat.st_mtime_ns)
+    if calibpath not in _CalibrationRegistry or _CalibrationRegistry[calibpath]['state'] != state:
+        with open(calibpath) as f:
+            config = json.load(f)
+        
+        boards = {}
+        for board, channels in config['boards'].items():
+            boards[int(board)] = {int(ch): np.asarray(coeffs, dtype=np.float64) for ch, coeffs in channels.items()}
+        
+        _CalibrationRegistry[calibpath] = {'version': config.get('version', 0), 'boards': boards, 'state': state}
+    
+    return _CalibrationRegistry[calibpath]
+
+def _Feather_CalibrationTag(board,calibpath=BaseCalibrationPath):
+    """
+    This FUNCTION returns the cache tag of a board's calibrated data. It holds the calibration version
+    and a hash of the config file's path and the board's coefficients, so data calibrated with any
+    other calibration file or coefficients is never returned from the cache.
+    """
+    calibpath = os.path.abspath(calibpath)
+    registry = Feather_LoadCalibration(calibpath)
+    channels = registry['boards'].get(board, {})
+    
+    key = hashlib.sha1(calibpath.encode())
+    for ch in sorted(channels):
+        key.update(b"|%d:" % ch + channels[ch].tobytes())
+    
+    return "feather-B" + str(board) + "-cal" + str(registry['version']) + "-" + key.hexdigest()[:16]
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_Calibrate(data_in,board,calibpath=BaseCalibrationPath):
+    """
+    This FUNCTION applies a feather board's calibration polynomials to whole resistance columns at once.
+    Data is modified in place.
+
+    INPUT:
+        data_in (Array)         ->      Array containing uncalibrated data from file
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #
+        board (Int)             ->      Feather board #
+        calibpath (script)      ->      Raw Script of filepath of calibration config file
+
+    OUTPUT:
+        data_out (Array)        ->      Same array with calibrated resistance channels
+    """
+    registry = Feather_LoadCalibration(calibpath)
+    if board not in registry['boards']:
+        raise KeyError("No calibration for feather board #" + str(board) + " in " + calibpath)
+    
+    for ch, coeffs in registry['boards'][board].items():
+        data_in[:,ch] = np.polyval(coeffs, data_in[:,ch])  # Channel ch - Resistance
+    
+    return data_in
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_DataExtract(filepath,board,calibpath=BaseCalibrationPath,cachedir=None):
+    """
+    This FUNCTION extracts CSV data outputed from any feather board into a float array and
+    calibrates the resistance readings using the board's entry in the calibration registry.
+
+    INPUT:
+        filepath (script)       ->      Raw Script of filepath of text file
+                                                Value:  File path of the file to be processed
+        board (Int)             ->      Feather board # (key in the calibration registry)
+        calibpath (script)      ->      Raw Script of filepath of calibration config file
+        cachedir (script)       ->      Directory of parsed run cache (None = no caching)
+                                                Cached runs are memory-mapped copy-on-write
+
+    OUTPUT:
+        data_out (Array)        ->      Array containing data from file
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #
+    """
+    if cachedir is not None:
+        tag = _Feather_CalibrationTag(board, calibpath)
+        data = Cache_Load(filepath, tag, cachedir)
+        if data is not None:
+            return data
+    
+    data = Feather_BulkParse(filepath)      # Parse file into array (channel 0 - Time, 1-4 - Resistance)
+    data = Feather_Calibrate(data, board, calibpath)
+    
+    if cachedir is not None:
+        Cache_Store(filepath, tag, data, cachedir)
+    
+    return data
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_StreamExtract(filepath,board,blocksize=1000000,calibpath=BaseCalibrationPath):
+    """
+    This FUNCTION is a generator that reads a feather board CSV log in blocks of a fixed number of
+    rows and yields each block calibrated. Only one block is kept in memory at a time, so logs larger
+    than RAM can be processed. As with the whole-file extractors the header row and the last row of
+    the file are dropped (before parsing, so a row cut mid line while the file is still being
+    written is never read), and time is converted from [ms] to [s].
+
+    INPUT:
+        filepath (script)       ->      Raw Script of filepath of text file
+                                                Value:  File path of the file to be processed
+        board (Int)             ->      Feather board # (key in the calibration registry)
+        blocksize (Int)         ->      Number of rows per yielded block (last block may be shorter)
+        calibpath (script)      ->      Raw Script of filepath of calibration config file
+
+    YIELDS:
+        block (Array)           ->      Array containing a block of consecutive rows from file
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep within block
+                                                - ch = channel #
+    """
+    n_ch = 5                                    # Number of channels
+    
+    with open(filepath,'rb') as f:
+        start, end = _Feather_BodyRange(f)
+        if end <= start:
+            return                              # No data rows in file
+        f.seek(start)
+        
+        reader = pd.read_csv(io.BufferedReader(_Feather_BodyReader(f, end - start)),
+                             header=None,
+                             usecols=range(n_ch),
+                             dtype=np.float64,
+                             chunksize=blocksize)
+        with reader:
+            for chunk in reader:
+                block = chunk.to_numpy()
+                block[:,0] /= 1000              # Channel 0 - Time [ms] -> [s]
+                yield Feather_Calibrate(block, board, calibpath)
+
+#-----------------------------------------------------------------------------------------------
+
+def _Feather_BodyRange(f,step=65536):
+    """
+    This FUNCTION returns the byte range of the rows kept by Feather_BulkParse (between the header
+    row and the last row) of an open binary file, reading only its start and end.
+    """
+    f.seek(0)
+    header = f.readline()
+    if not header.endswith(b'\n'):
+        return 0, 0                             # No complete header row
+    start = len(header)
+    
+    # Search back from the end of the file for the newline ending the last kept row
+    size = f.seek(0, os.SEEK_END)
+    pos, tail = size, b''
+    while pos > start:
+        pos = max(start, pos - step)
+        f.seek(pos)
+        tail = f.read(min(step, size - pos)) + tail
+        if tail.count(b'\n', 0, len(tail)-1) > 0:     # A newline before the last byte ends a kept row
+            break
+    end = tail.rfind(b'\n', 0, len(tail)-1)
+    return start, (pos + end + 1 if end >= 0 else start)
+
+class _Feather_BodyReader(io.RawIOBase):
+    """
+    Read only view of the next size bytes of an open binary file (the rows given by _Feather_BodyRange).
+    """
+    def __init__(self,f,size):
+        self._f = f
+        self._left = size
+    
+    def readable(self):
+        return True
+    
+    def readinto(self,b):
+        n = self._f.readinto(memoryview(b)[:self._left]) if self._left > 0 else 0
+        self._left -= n
+        return n
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
 def B1Feather_DataExtract(filepath):
     """
     This FUNCTION extracts CSV data outputed from feather board #1 into float 
@@ -25,44 +302,11 @@ def B1Feather_DataExtract(filepath):
                                                 - n  = n'th timestep
                                                 - ch = channel #
     """
-    with open(filepath) as f:
-        file = list(f)       # Import data from file
-        del file[-1]         # Delete last row to avoid junk (sometimes a row will be cut mid line when shutting down)
-        del file[0]          # Delete first row to avoid headers
-        
-        
-            
-        # Initialize data
-        #data = {} # Dictionary containing output data
-        i = 0     # Data line count
-        n_dt = len(file)    # Number of data points in file 
-        n_ch = 5            # Number of channels
-        data = np.zeros([n_dt,n_ch])
-        
-        
-        for line in file:  
-            
-            fields = line.split(",")        # Takes current line and splits it into the different channels
-                        
-            # Extract data from each line
-            data[(i,0)]   =   (float(fields[0]) / 1000)   # Channel 0 - Time
-            data[(i,1)]   =   float(fields[1])            # Channel 1 - Resistance
-            data[(i,2)]   =   float(fields[2])            # Channel 2 - Resistance
-            data[(i,3)]   =   float(fields[3])            # Channel 3 - Resistance
-            data[(i,4)]   =   float(fields[4])            # Channel 4 - Resistance
-
-            # Apply Feather Board calibration
-            data[(i,1)]   =   (-0.00005)*(data[(i,1)])**2 + (1.0496)*(data[(i,1)]) - (7.0071)
-            data[(i,2)]   =   (data[(i,2)])
-            data[(i,3)]   =   (-0.00001)*(data[(i,3)])**2 + (1.0139)*(data[(i,3)]) - (0.634)
-            data[(i,4)]   =   (data[(i,4)])      
-            
-            i += 1
-        
-    return data
+    return Feather_DataExtract(filepath, 1)
 
 #-----------------------------------------------------------------------------------------------
 
+@Profile_Staged
 def B2Feather_DataExtract(filepath):
     """
     This FUNCTION extracts CSV data outputed from feather board #2 into float 
@@ -78,45 +322,85 @@ def B2Feather_DataExtract(filepath):
                                                 - n  = n'th timestep
                                                 - ch = channel #
     """
-    with open(filepath) as f:
-        file = list(f)       # Import data from file
-        del file[-1]         # Delete last row to avoid junk (sometimes a row will be cut mid line when shutting down)
-        del file[0]          # Delete first row to avoid headers
-        
+    return Feather_DataExtract(filepath, 2)
+
+#-----------------------------------------------------------------------------------------------
+
+class Feather_Follow:
+    """
+    This CLASS follows a feather board CSV log that is still being written. It remembers how many
+    bytes of the file have been consumed, and each poll() parses only the complete rows appended
+    since the last poll. Rows are calibrated and appended to a growable array, so each refresh costs
+    time proportional to the new data rather than the file size. A row that is cut mid line is left
+    unread until it is finished (unlike the whole-file extractors, the last row is not thrown away).
+
+    INPUT:
+        filepath (script)       ->      Raw Script of filepath of text file
+        board (Int)             ->      Feather board # (key in the calibration registry)
+        calibpath (script)      ->      Raw Script of filepath of calibration config file
+        capacity (Int)          ->      Initial number of rows allocated (doubles when full)
+
+    ATTRIBUTES:
+        data (Array)            ->      View of all rows read so far
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #
+        offset (Int)            ->      Number of bytes of the file consumed
+    """
+    
+    def __init__(self,filepath,board,calibpath=BaseCalibrationPath,capacity=100000):
+        self.filepath   = filepath
+        self.board      = board
+        self.calibpath  = calibpath
+        self.offset     = 0                                 # Bytes of file consumed
+        self.n          = 0                                 # Rows stored
+        self._buf       = np.zeros([max(capacity,1),5])     # Row storage (channel 0 - Time, 1-4 - Resistance)
+    
+    @property
+    def data(self):
+        return self._buf[:self.n]
+    
+    def poll(self):
+        """
+        Reads the complete rows appended to the file since the last poll.
+
+        OUTPUT:
+            n_new (Int)         ->      Number of new rows added to data
+        """
+        with open(self.filepath,'rb') as f:
+            if os.fstat(f.fileno()).st_size < self.offset:   # File was replaced or truncated, start over
+                self.offset = 0
+                self.n = 0
+            f.seek(self.offset)
+            raw = f.read()
         
-            
-        # Initialize data
-        #data = {} # Dictionary containing output data
-        i = 0     # Data line count
-        n_dt = len(file)    # Number of data points in file 
-        n_ch = 5            # Number of channels
-        data = np.zeros([n_dt,n_ch])
+        start = 0
+        if self.offset == 0:
+            start = raw.find(b'\n') + 1         # Skip header row
+            if start == 0:
+                return 0                        # Header row not finished yet
+        end = raw.rfind(b'\n') + 1              # End of last complete row
+        if end <= start:
+            return 0
         
+        rows = Feather_Calibrate(_Feather_ParseRows(raw[start:end]), self.board, self.calibpath)
+        self.offset += end
         
-        for line in file:  
-            
-            fields = line.split(",")        # Takes current line and splits it into the different channels
-                        
-            # Extract data from each line
-            data[(i,0)]   =   (float(fields[0]) / 1000)   # Channel 0 - Time
-            data[(i,1)]   =   float(fields[1])            # Channel 1 - Resistance
-            data[(i,2)]   =   float(fields[2])            # Channel 2 - Resistance
-            data[(i,3)]   =   float(fields[3])            # Channel 3 - Resistance
-            data[(i,4)]   =   float(fields[4])            # Channel 4 - Resistance
-
-            # Apply Feather Board calibration
-            data[(i,1)]   =   (-0.000006)*(data[(i,1)])**2 + (1.0267)*(data[(i,1)]) + (-14.281)
-            data[(i,2)]   =   (data[(i,2)])
-            data[(i,3)]   =   (-0.00001)*(data[(i,3)])**2 + (1.0139)*(data[(i,3)]) - (0.634)
-            data[(i,4)]   =   (data[(i,4)])      
-            
-            i += 1
+        # Grow storage by doubling so appends are amortized
+        n_new = len(rows)
+        if self.n + n_new > len(self._buf):
+            buf = np.zeros([max(2*len(self._buf), self.n + n_new), 5])
+            buf[:self.n] = self._buf[:self.n]
+            self._buf = buf
+        self._buf[self.n:self.n+n_new] = rows
+        self.n += n_new
         
-    return data
+        return n_new
 
 #-----------------------------------------------------------------------------------------------
 
-def DMA_Extract_TF(filepath):          
+@Profile_Staged
+def DMA_Extract_TF(filepath,cachedir=None,columnar=False,trange=None):
     """_summary_
     FUNCTION that extracts data from DMA output CSV files into float arrays stored within a dictionary
     Data from DMA -> Time, and force
@@ -124,6 +408,12 @@ def DMA_Extract_TF(filepath):
     INPUT:
         filepath    ->      Type:   Raw Script
                             Value:  File path of the file to be processed
+        cachedir    ->      Type:   Raw Script
+                            Value:  Directory of parsed run cache (None = no caching)
+        columnar    ->      Type:   Bool
+                            Value:  If true, read from a Parquet copy of the export (see DMA_ToColumnar)
+        trange      ->      Type:   Tuple (Float,Float)
+                            Value:  Only return rows with elapsed time in [t_min, t_max] (None = all)
 
     OUTPUT:
         data        ->      Type: Pandas Dataframe
@@ -131,16 +421,19 @@ def DMA_Extract_TF(filepath):
     """
     
     cols = ['Points','Elapsed Time ','Load   ']     # Define column names
-    file = pd.read_csv(filepath,usecols=cols)
     
-    data = file.dropna()    # Removes empty cells
+    if columnar:
+        file = DMA_ReadColumnar(filepath,cols,trange)  # Only decodes the needed columns and row groups
+    else:
+        if cachedir is not None:
+            cached = Cache_Load(filepath, "dma-TF", cachedir)
+            if cached is not None:
+                return _DMA_TimeWindow(pd.DataFrame.from_records(cached, index='index').rename_axis(None), trange)
+        file = pd.read_csv(filepath,usecols=cols)
     
-    def signflip(inp):      # Define a function to flip the sign on data
-        return inp*-1
+    data = file.dropna()    # Removes empty cells
     
-    newforce = data['Load   ']                     # Extract load values from dataframe
-    newforce = newforce.apply(signflip)       # Apply sign flip to all values in new force
-    data.update(newforce)                    # Insert modified values back into original dataframe
+    data['Load   '] = -data['Load   ']      # Flip the sign on all force values
     
     '''
     with open(filepath) as f:
@@ -170,11 +463,15 @@ def DMA_Extract_TF(filepath):
     }
     '''
     
-    return data
+    if cachedir is not None and not columnar:
+        Cache_Store(filepath, "dma-TF", data.to_records(index=True), cachedir)
+    
+    return _DMA_TimeWindow(data, trange)
 
 #-----------------------------------------------------------------------------------------------
 
-def DMA_Extract_TFD(filepath):          
+@Profile_Staged
+def DMA_Extract_TFD(filepath,cachedir=None,columnar=False,trange=None):
     """
     FUNCTION that extracts data from DMA output CSV files into float arrays stored within a dictionary.
     Data from DMA -> Time, Displacement, and force
@@ -182,6 +479,12 @@ def DMA_Extract_TFD(filepath):
     INPUT:
         filepath    ->      Type:   Raw Script
                             Value:  File path of the file to be processed
+        cachedir    ->      Type:   Raw Script
+                            Value:  Directory of parsed run cache (None = no caching)
+        columnar    ->      Type:   Bool
+                            Value:  If true, read from a Parquet copy of the export (see DMA_ToColumnar)
+        trange      ->      Type:   Tuple (Float,Float)
+                            Value:  Only return rows with elapsed time in [t_min, t_max] (None = all)
 
     OUTPUT:
         data        ->      Type: Pandas Dataframe
@@ -189,33 +492,776 @@ def DMA_Extract_TFD(filepath):
     """
     
     cols = ['Points','Elapsed Time ','Disp     ','Load   ']     # Define column names
-    file = pd.read_csv(filepath,usecols=cols)
     
-    data = file.dropna()    # Removes empty cells
+    if columnar:
+        file = DMA_ReadColumnar(filepath,cols,trange)  # Only decodes the needed columns and row groups
+    else:
+        if cachedir is not None:
+            cached = Cache_Load(filepath, "dma-TFD", cachedir)
+            if cached is not None:
+                return _DMA_TimeWindow(pd.DataFrame.from_records(cached, index='index').rename_axis(None), trange)
+        file = pd.read_csv(filepath,usecols=cols)
     
-    def signflip(inp):      # Define a function to flip the sign on data
-        return inp*-1
+    data = file.dropna()    # Removes empty cells
     
     # Force Data Cleaning
-    newforce = data['Load   ']               # Extract load values from dataframe
-    newforce = newforce.apply(signflip)      # Apply sign flip to all values in new force
-    data.update(newforce)                    # Insert modified values back into original dataframe
+    data['Load   '] = -data['Load   ']                          # Flip the sign on all force values
     
     # Displacement Data Cleaning
-    newdisp = data['Disp     ']         # Extract disp values from df for editiing
-    initdisp = newdisp[0]               # Initial Position Value
-    newdisp = newdisp.sub(initdisp)     # Subtract out initial value from all entries
-    data.update(newdisp)
+    if columnar:
+        initdisp = _DMA_ColumnarInitial(filepath,'Disp     ')    # Initial position (may be outside trange)
+    else:
+        initdisp = data['Disp     '][0]                         # Initial position
+    data['Disp     '] = data['Disp     '] - initdisp            # Subtract out initial position from all entries
+    
+    if cachedir is not None and not columnar:
+        Cache_Store(filepath, "dma-TFD", data.to_records(index=True), cachedir)
+    
+    return _DMA_TimeWindow(data, trange)
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def DMA_ToColumnar(filepath,colpath=None,rowgroup=65536):
+    """
+    FUNCTION that converts a DMA output CSV file to a compressed columnar Parquet file, once. The
+    conversion is redone only when the CSV is newer than the Parquet file. Rows are stored in groups
+    so that reads filtered on elapsed time only decode the groups that overlap the time range.
+    Requires pyarrow.
+
+    INPUT:
+        filepath    ->      Type:   Raw Script
+                            Value:  File path of the DMA CSV file
+        colpath     ->      Type:   Raw Script
+                            Value:  File path of the Parquet file (None = CSV path with .parquet extension)
+        rowgroup    ->      Type:   Int
+                            Value:  Number of rows per Parquet row group
+
+    OUTPUT:
+        colpath     ->      Type:   Raw Script
+                            Value:  File path of the Parquet file
+    """
+    if colpath is None:
+        colpath = os.path.splitext(filepath)[0] + ".parquet"
+    
+    if (not os.path.exists(colpath) or os.path.getmtime(colpath) < os.path.getmtime(filepath)
+            or not _DMA_ColumnarIndexed(colpath)):
+        file = pd.read_csv(filepath, engine=DMA_CSVEngine)
+        with File_Atomic(colpath) as tmppath:
+            file.to_parquet(tmppath, engine='pyarrow', compression='zstd', row_group_size=rowgroup,
+                            index=True)     # Stores the CSV row labels, so filtered reads keep them
+    
+    return colpath
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def DMA_ReadColumnar(filepath,cols,trange=None):
+    """
+    FUNCTION that reads columns of a DMA output CSV file from its Parquet copy, converting it first
+    if needed. Only the requested columns are read, and an elapsed time range is pushed down to
+    the Parquet reader so row groups outside the range are skipped. Rows keep their CSV row labels
+    as index, as when reading the CSV.
+
+    INPUT:
+        filepath    ->      Type:   Raw Script
+                            Value:  File path of the DMA CSV file
+        cols        ->      Type:   List of Strings
+                            Value:  Column names as in the CSV header (e.g. 'Load   ')
+        trange      ->      Type:   Tuple (Float,Float)
+                            Value:  Only read rows with elapsed time in [t_min, t_max] (None = all)
+
+    OUTPUT:
+        data        ->      Type: Pandas Dataframe
+                            Key: Data [cols]
+    """
+    colpath = DMA_ToColumnar(filepath)
+    
+    filters = None
+    if trange is not None:
+        filters = [('Elapsed Time ', '>=', trange[0]), ('Elapsed Time ', '<=', trange[1])]
+    
+    return pd.read_parquet(colpath, engine='pyarrow', columns=list(cols), filters=filters)
+
+#-----------------------------------------------------------------------------------------------
+
+def _DMA_ColumnarIndexed(colpath):
+    """
+    FUNCTION that checks whether a Parquet copy stores its row labels as a column (older copies
+    only stored a range index, which is renumbered from 0 on filtered reads).
+    """
+    import pyarrow.parquet as pq
+    
+    meta = pq.read_schema(colpath).pandas_metadata or {}
+    
+    return any(isinstance(col, str) for col in meta.get('index_columns', []))
+
+#-----------------------------------------------------------------------------------------------
+
+def _DMA_ColumnarInitial(filepath,col):
+    """
+    FUNCTION that returns the first value of a column of a DMA export by decoding only the first
+    row group of its Parquet copy.
+    """
+    import pyarrow.parquet as pq
+    
+    first = pq.ParquetFile(DMA_ToColumnar(filepath)).read_row_group(0, columns=[col])
     
+    return first.column(0)[0].as_py()
+
+#-----------------------------------------------------------------------------------------------
+
+def _DMA_TimeWindow(data,trange):
+    """
+    FUNCTION that keeps only the rows of DMA data with elapsed time in trange = (t_min, t_max).
+    """
+    if trange is None:
+        return data
+    
+    t = data['Elapsed Time ']
+    
+    return data[(t >= trange[0]) & (t <= trange[1])]
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def DMA_FastExtract(filepath,cols=('Points','Elapsed Time','Disp','Load'),engine=None):
+    """
+    FUNCTION that quickly extracts DMA output CSV files into a dataframe with float columns.
+    Column names are stripped of the DMA's padding ('Load   ' -> 'Load'), only the requested
+    columns are parsed, and force sign flipping and displacement zeroing are done on whole columns.
+    Uses the pyarrow CSV engine when it is installed.
+
+    INPUT:
+        filepath    ->      Type:   Raw Script
+                            Value:  File path of the file to be processed
+        cols        ->      Type:   List of Strings
+                            Value:  Column names to extract, without padding
+        engine      ->      Type:   String
+                            Value:  pandas CSV engine (None = DMA_CSVEngine)
+
+    OUTPUT:
+        data        ->      Type: Pandas Dataframe
+                            Key: Data [cols] e.g. ['Points','Elapsed Time','Disp','Load']
+    """
+    if engine is None:
+        engine = DMA_CSVEngine
+    
+    # Match requested columns to the padded names in the header
+    with open(filepath) as f:
+        header = f.readline().rstrip('\r\n').split(',')
+    names = {name.strip(): name for name in header}
+    usecols = [names[c] for c in cols]
+    
+    data = pd.read_csv(filepath,
+                       usecols=usecols,
+                       dtype={c: np.float64 for c in usecols},
+                       engine=engine)
+    data = data.rename(columns={names[c]: c for c in cols})[list(cols)]
+    data = data.dropna().reset_index(drop=True)     # Removes empty cells
+    
+    if 'Load' in data:
+        data['Load'] = -data['Load']                        # Flip the sign on all force values
+    if 'Disp' in data and len(data) > 0:
+        data['Disp'] = data['Disp'] - data['Disp'].iloc[0]  # Subtract out initial position
     
     return data
 
 #-----------------------------------------------------------------------------------------------
 
+#===============================================================================================
+# Data Model
+#===============================================================================================
+
+class Feather_Run:
+    """
+    This CLASS stores a feather board run column by column in a compact form: time as float64 and
+    the resistance channels in one column-major array of a selectable dtype (float32 halves their
+    memory). It behaves like the usual (n,ch) data array where the processing and plotting functions
+    use it: run[:,ch] and run[n,ch] read channels without copying (channel 0 is time), run[n] gives
+    row n as an array, run[rows] gives a run of the selected rows (a view for slices), and
+    run[:,ch] = values writes a channel.
+    Channels can also be read by name, e.g. run['R1'].
+
+    INPUT:
+        time (Array)            ->      1D Array of time values in [s]
+        resist (Array)          ->      2D Array of resistance values (n, channels)
+        dtype (Type)            ->      Storage dtype of the resistance channels
+        names (Tuple)           ->      Channel names, time first
+        offsets (Array)         ->      Row offsets of the cycle edges (see Feather_CycleIndex), or None
+        meta (Dictionary)       ->      Test metadata, e.g. {'ch', 't_start', 'dur_cycle', 'cyclecount',
+                                        'include', 'reason', 'board', 'path'}
+    """
+    __slots__ = ('time', 'resist', 'names', 'offsets', 'meta')
+    
+    def __init__(self,time,resist,dtype=np.float32,names=('Time','R1','R2','R3','R4'),offsets=None,meta=None):
+        self.time    = np.asarray(time, dtype=np.float64)
+        self.resist  = np.asarray(resist, dtype=dtype, order='F')      # Column-major so each channel is contiguous
+        self.names   = tuple(names)
+        self.offsets = offsets
+        self.meta    = {} if meta is None else meta
+    
+    @classmethod
+    def _view(cls,time,resist,names,meta):
+        """Builds a run around existing arrays without converting them (row slices stay views)."""
+        run = object.__new__(cls)
+        run.time, run.resist, run.names, run.offsets, run.meta = time, resist, names, None, meta
+        return run
+    
+    @classmethod
+    def from_array(cls,data_in,dtype=np.float32,**kwargs):
+        """Builds a run from an (n,ch) data array (channel 0 - Time)."""
+        return cls(data_in[:,0], data_in[:,1:], dtype=dtype, **kwargs)
+    
+    def to_array(self):
+        """Returns the run as an (n,ch) float64 data array (copies the data)."""
+        return np.column_stack((self.time, self.resist.astype(np.float64)))
+    
+    def __array__(self,dtype=None,copy=None):
+        data_out = self.to_array()
+        return data_out if dtype is None else data_out.astype(dtype)
+    
+    @property
+    def shape(self):
+        return (len(self.time), 1 + self.resist.shape[1])
+    
+    @property
+    def nbytes(self):
+        return self.time.nbytes + self.resist.nbytes
+    
+    def __len__(self):
+        return len(self.time)
+    
+    def _column(self,ch):
+        if isinstance(ch, str):
+            ch = self.names.index(ch)
+        return self.time if ch == 0 else self.resist[:,ch-1]
+    
+    def __getitem__(self,key):
+        if isinstance(key, str):
+            return self._column(key)
+        if isinstance(key, tuple):
+            rows, ch = key
+            if isinstance(ch, (int, np.integer, str)):
+                return self._column(ch)[rows]
+            return self.to_array()[key]
+        if isinstance(key, numbers.Integral):
+            return np.concatenate(([self.time[key]], self.resist[key].astype(np.float64)))  # One row, as data_in[n]
+        return Feather_Run._view(self.time[key], self.resist[key], self.names, self.meta)
+    
+    def __setitem__(self,key,value):
+        rows, ch = key if isinstance(key, tuple) else (slice(None), key)
+        self._column(ch)[rows] = value
+    
+    def copy(self):
+        return Feather_Run(self.time.copy(), self.resist.copy(order='F'), dtype=self.resist.dtype, names=self.names,
+                           offsets=None if self.offsets is None else self.offsets.copy(), meta=dict(self.meta))
+    
+    def cycles(self,t_start=None,dur_cycle=None,cyclecount=None):
+        """
+        Splits the run into cycles (see Feather_CycleIndex), storing the cycle offsets on the run.
+        Missing arguments are taken from meta.
+        """
+        index = Feather_CycleIndex(self,
+                                   self.meta['t_start'] if t_start is None else t_start,
+                                   self.meta['dur_cycle'] if dur_cycle is None else dur_cycle,
+                                   self.meta['cyclecount'] if cyclecount is None else cyclecount)
+        self.offsets = index.offsets
+        return index
+
+#-----------------------------------------------------------------------------------------------
+
+#===============================================================================================
+# Cache Functions
+#===============================================================================================
+
+@contextlib.contextmanager
+def File_Atomic(filepath):
+    """
+    This FUNCTION is a context manager yielding a temporary path to write a file to. The temporary
+    file replaces filepath only once the block finishes, so a crash never leaves a partial file.
+
+    INPUT:
+        filepath (script)       ->      Raw Script of filepath of the file to write
+
+    OUTPUT:
+        tmppath (script)        ->      Raw Script of filepath to write to inside the block
+    """
+    tmppath = filepath + ".part"
+    try:
+        yield tmppath
+        os.replace(tmppath, filepath)
+    finally:
+        if os.path.exists(tmppath):
+            os.remove(tmppath)
+
+#-----------------------------------------------------------------------------------------------
+
+def _Cache_Names(filepath,tag):
+    """
+    This FUNCTION builds the cache file name for a source file. The name is made of a hash of the
+    source path and tag, then a hash of the source file's size and modification time. Any edit to
+    the source changes the second half of the name (a new calibration changes the tag instead).
+
+    OUTPUT:
+        prefix (String)         ->      Name shared by all cache entries of this source and tag
+        name (String)           ->      File name of the current cache entry
+    """
+    filepath = os.path.abspath(filepath)
+    stat = os.stat(filepath)
+    prefix = hashlib.sha1((filepath + "|" + tag).encode()).hexdigest()[:16]
+    state = hashlib.sha1((str(stat.st_size) + "|" + str(stat.st_mtime_ns)).encode()).hexdigest()[:16]
+    
+    return prefix, prefix + "_" + state + ".npy"
+
+#-----------------------------------------------------------------------------------------------
+
+def Cache_Load(filepath,tag,cachedir=BaseCachePath):
+    """
+    This FUNCTION loads a parsed run from the cache by memory-mapping it (copy-on-write, so no data
+    is read until used and edits never reach the cache). Entries for older versions of the same
+    source file are deleted.
+
+    INPUT:
+        filepath (script)       ->      Raw Script of filepath of the source file
+        tag (String)            ->      Kind of parsed data (extractor, board and calibration)
+        cachedir (script)       ->      Directory of parsed run cache
+
+    OUTPUT:
+        data_out (Array)        ->      Memory-mapped array, or None if there is no valid cache entry
+    """
+    if not os.path.isdir(cachedir):
+        return None
+    
+    prefix, name = _Cache_Names(filepath, tag)
+    data_out = None
+    
+    for entry in os.scandir(cachedir):
+        if not entry.name.startswith(prefix + "_"):
+            continue
+        if entry.name == name:
+            data_out = np.load(entry.path, mmap_mode='c', allow_pickle=False)
+            os.utime(entry.path)                # Mark as recently used for eviction
+        else:
+            os.remove(entry.path)               # Stale entry from an older version of the file
+    
+    return data_out
+
+#-----------------------------------------------------------------------------------------------
+
+def Cache_Store(filepath,tag,data_in,cachedir=BaseCachePath,maxbytes=None):
+    """
+    This FUNCTION saves a parsed run to the cache as a .npy file, then evicts the least recently used
+    entries until the cache directory is within its size limit.
+
+    INPUT:
+        filepath (script)       ->      Raw Script of filepath of the source file
+        tag (String)            ->      Kind of parsed data (extractor, board and calibration)
+        data_in (Array)         ->      Parsed data (plain or structured array)
+        cachedir (script)       ->      Directory of parsed run cache
+        maxbytes (Int)          ->      Size limit of the cache directory (None = CacheMaxBytes)
+    """
+    os.makedirs(cachedir, exist_ok=True)
+    prefix, name = _Cache_Names(filepath, tag)
+    
+    with File_Atomic(os.path.join(cachedir, name)) as tmppath, open(tmppath, 'wb') as f:
+        np.save(f, data_in, allow_pickle=False)
+    
+    Cache_Evict(cachedir, maxbytes, keep=name)
+
+#-----------------------------------------------------------------------------------------------
+
+def Cache_Evict(cachedir=BaseCachePath,maxbytes=None,keep=None):
+    """
+    This FUNCTION deletes the least recently used cache entries until the total size of the cache
+    directory is at or below maxbytes.
+
+    INPUT:
+        cachedir (script)       ->      Directory of parsed run cache
+        maxbytes (Int)          ->      Size limit of the cache directory (None = CacheMaxBytes)
+        keep (String)           ->      File name of an entry that is never evicted
+    """
+    if maxbytes is None:
+        maxbytes = CacheMaxBytes
+    
+    entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(cachedir)
+               if e.name.endswith(".npy") and e.name != keep]
+    total = sum(size for _, size, _ in entries)
+    if keep is not None and os.path.exists(os.path.join(cachedir, keep)):
+        total += os.path.getsize(os.path.join(cachedir, keep))
+    
+    for _, size, path in sorted(entries):       # Oldest use first
+        if total <= maxbytes:
+            break
+        os.remove(path)
+        total -= size
+
+#-----------------------------------------------------------------------------------------------
+
+#===============================================================================================
+# Batch Functions
+#===============================================================================================
+
+def Campaign_Manifest(source):
+    """
+    This FUNCTION lists the samples of a test campaign, either from a JSON manifest file or by
+    scanning a directory. Sample numbers start at 1 (as in the "S1" plot names); relative paths in
+    a manifest are taken relative to the manifest's directory.
+    
+    Manifest format:
+        {"samples": [{"sample": 1, "feather": "S1_B1.txt", "board": 1, "dma": "S1.csv", "dma_mode": "TFD",
+                      "ch": 1, "t_start": 10.0, "dur_cycle": 60.0, "cyclecount": 5,
+                      "include": true, "reason": ""}, ...]}
+    
+    Directory scan:
+        *.txt files are feather logs and *.csv files are DMA exports (read with DMA_Extract_TFD).
+        The sample number is taken from "S<n>" in the file name and the feather board from "B<n>",
+        each a separate part of the name (e.g. "S3_B1.txt", "S3.csv"; "runs3_S4.txt" is sample 4).
+        Two feather logs or two DMA exports for the same sample raise a ValueError.
+
+    INPUT:
+        source (script)         ->      Raw Script of filepath of manifest file or campaign directory
+
+    OUTPUT:
+        samples (List)          ->      List of dictionaries, one per sample, with the manifest keys above
+    """
+    if os.path.isfile(source):
+        with open(source) as f:
+            samples = json.load(f)['samples']
+        basedir = os.path.dirname(os.path.abspath(source))
+        for entry in samples:
+            for key in ('feather','dma'):
+                if entry.get(key):
+                    entry[key] = os.path.join(basedir, entry[key])
+        return samples
+    
+    samples = {}
+    for name in sorted(os.listdir(source)):
+        ext = os.path.splitext(name)[1].lower()
+        sample = re.search(CampaignField % 'S', name)
+        if ext not in ('.txt','.csv') or sample is None:
+            continue
+        entry = samples.setdefault(int(sample.group(1)), {'sample': int(sample.group(1))})
+        key = 'feather' if ext == '.txt' else 'dma'
+        if key in entry:
+            raise ValueError("Sample %d has two %s files in %s: %s and %s"
+                             % (entry['sample'], key, source, os.path.basename(entry[key]), name))
+        entry[key] = os.path.join(source, name)
+        if ext == '.txt':
+            board = re.search(CampaignField % 'B', name)
+            entry['board'] = int(board.group(1)) if board is not None else None
+    
+    return [samples[n] for n in sorted(samples)]
+
+#-----------------------------------------------------------------------------------------------
+
+def _Campaign_Job(kind,path,board,dma_mode,cachedir):
+    """
+    This FUNCTION runs one extraction job of a campaign (run in a worker process).
+    """
+    if kind == 'feather':
+        if board is None:
+            raise ValueError("No feather board # for " + path)
+        return Feather_DataExtract(path, board, cachedir=cachedir)
+    if dma_mode == 'TF':
+        return DMA_Extract_TF(path, cachedir=cachedir)
+    return DMA_Extract_TFD(path, cachedir=cachedir)
+
+#-----------------------------------------------------------------------------------------------
+
+def Campaign_ExtractIter(source,workers=None,cachedir=None):
+    """
+    This FUNCTION is a generator that extracts every file of a test campaign across a process pool,
+    sending each file to the DMA or feather board extractor. Results are yielded as each file
+    finishes. A file that fails to extract is yielded with its error instead of stopping the batch.
+
+    INPUT:
+        source (script)         ->      Raw Script of filepath of manifest file or campaign directory
+                                                (see Campaign_Manifest)
+        workers (Int)           ->      Number of worker processes (None = number of CPUs)
+        cachedir (script)       ->      Directory of parsed run cache passed to the extractors (None = no caching)
+
+    YIELDS:
+        (sample, kind, path, data, error)
+            sample (Int)        ->      Sample # as in the manifest or file name (e.g. 3 for "S3")
+            kind (String)       ->      'feather' or 'dma'
+            path (script)       ->      File path of the extracted file
+            data                ->      Extracted array / dataframe (None on error)
+            error (Exception)   ->      Error raised while extracting (None on success)
+    """
+    samples = Campaign_Manifest(source)
+    
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for entry in samples:
+            for kind in ('feather','dma'):
+                if entry.get(kind):
+                    job = pool.submit(_Campaign_Job, kind, entry[kind], entry.get('board'),
+                                      entry.get('dma_mode','TFD'), cachedir)
+                    futures[job] = (entry['sample'], kind, entry[kind])
+        
+        for job in concurrent.futures.as_completed(futures):
+            sample, kind, path = futures[job]
+            try:
+                yield sample, kind, path, job.result(), None
+            except Exception as error:
+                yield sample, kind, path, None, error
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged(bytes_arg=None)         # Source is a manifest or directory, files are read by the workers
+def Campaign_Extract(source,workers=None,cachedir=None):
+    """
+    This FUNCTION extracts a whole test campaign in parallel and collects it into sample indexed
+    dictionaries, shaped like the data_in / testparam inputs of the plotting functions. Samples are
+    indexed 0..n-1 in order of sample # (as in Pipeline.py), so sparse sample numbers leave no gaps.
+    A sample with a file that failed to extract is left out, and the samples after it move up.
+
+    INPUT:
+        source (script)         ->      Raw Script of filepath of manifest file or campaign directory
+        workers (Int)           ->      Number of worker processes (None = number of CPUs)
+        cachedir (script)       ->      Directory of parsed run cache (None = no caching)
+
+    OUTPUT:
+        campaign (Dictionary)   ->      Dictionary containing the extracted campaign
+                                            'feather'   -> {s: feather array (n,ch)}
+                                            'dma'       -> {s: DMA dataframe}
+                                            'testparam' -> {s: (ch,t_start,dur_cycle,cyclecount,include,reason)}
+                                                            for samples with these fields in the manifest
+                                            'samples'   -> {s: sample #} (e.g. {0: 3, 1: 4, 2: 12})
+                                            'errors'    -> {path: error} for files that failed to extract
+    """
+    entries = {entry['sample']: entry for entry in Campaign_Manifest(source)}
+    extracted = {'feather': {}, 'dma': {}}
+    errors = {}
+    
+    for sample, kind, path, data, error in Campaign_ExtractIter(source, workers, cachedir):
+        if error is None:
+            extracted[kind][sample] = data
+        else:
+            errors[path] = error
+    
+    failed = {entry['sample'] for entry in entries.values()
+              if any(entry.get(kind) in errors for kind in ('feather','dma'))}
+    campaign = {'feather': {}, 'dma': {}, 'testparam': {}, 'samples': {}, 'errors': errors}
+    
+    for s, sample in enumerate(n for n in sorted(entries) if n not in failed):
+        entry = entries[sample]
+        campaign['samples'][s] = sample
+        for kind in ('feather','dma'):
+            if sample in extracted[kind]:
+                campaign[kind][s] = extracted[kind][sample]
+        if 'ch' in entry:
+            campaign['testparam'][s] = (entry['ch'], entry.get('t_start'), entry.get('dur_cycle'),
+                                        entry.get('cyclecount'), entry.get('include', True),
+                                        entry.get('reason', ""))
+    
+    return campaign
+
+#-----------------------------------------------------------------------------------------------
+
+#===============================================================================================
+# Synchronization Functions
+#===============================================================================================
+
+@Profile_Staged
+def Sync_Resample(t_src,y_src,t_dst,chunksize=1000000):
+    """
+    This FUNCTION linearly interpolates a signal onto another time base. The target times are
+    processed in chunks, and each chunk only uses the part of the source that overlaps it, so
+    temporary memory stays bounded for long runs. Target times outside the source are set to NaN.
+    Both time bases must be increasing.
+
+    INPUT:
+        t_src (Array)           ->      1D Array of source time values in [s]
+        y_src (Array)           ->      1D Array of source values, or 2D array (n, channels)
+        t_dst (Array)           ->      1D Array of target time values in [s]
+        chunksize (Int)         ->      Number of target times interpolated per chunk
+
+    OUTPUT:
+        y_dst (Array)           ->      Source values at the target times (same number of columns as y_src)
+    """
+    t_src = np.asarray(t_src, dtype=np.float64)
+    t_dst = np.asarray(t_dst, dtype=np.float64)
+    y_src = np.asarray(y_src, dtype=np.float64)
+    y_2d  = y_src.reshape(len(t_src), -1)
+    y_dst = np.full([len(t_dst), y_2d.shape[1]], np.nan)
+    
+    for i in range(0, len(t_dst), chunksize):
+        t = t_dst[i:i+chunksize]
+        # Source samples bracketing this chunk
+        lo = max(np.searchsorted(t_src, t[0], side='right') - 1, 0)
+        hi = min(np.searchsorted(t_src, t[-1], side='left') + 1, len(t_src))
+        for k in range(y_2d.shape[1]):
+            y_dst[i:i+chunksize,k] = np.interp(t, t_src[lo:hi], y_2d[lo:hi,k], left=np.nan, right=np.nan)
+    
+    return y_dst.reshape((len(t_dst),) + y_src.shape[1:])
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_DMA_Sync(data_in,dma,ch,t_start=0.0,base='dma',col='Load   ',chunksize=1000000):
+    """
+    This FUNCTION puts feather board resistance and DMA force (or displacement) on a common time
+    base so they can be compared point for point (e.g. in RvF_plot). The feather and DMA sample at
+    different rates, so one stream is interpolated onto the other's times, or both are interpolated
+    onto a uniform grid. Only the time span covered by both streams is returned.
+
+    INPUT:
+        data_in (Array)         ->      Array containing data from feather
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #
+        dma (Dataframe)         ->      DMA data for the same test
+        ch (Int/List)           ->      Resistance channel(s) to return
+        t_start (Float)         ->      Feather time at which the DMA elapsed time is 0
+        base (String/Float)     ->      Time base of the output
+                                            'dma'     = DMA sample times
+                                            'feather' = feather sample times
+                                            Float     = uniform grid with this time step in [s]
+        col (String)            ->      DMA column to return (e.g. 'Load   ' or 'Disp     ')
+        chunksize (Int)         ->      Number of points interpolated per chunk
+
+    OUTPUT:
+        time (Array)            ->      1D Array of time values in [s] (DMA elapsed time)
+        resist (Array)          ->      Resistance at each time (2D if ch is a list)
+        force (Array)           ->      DMA column value at each time
+    """
+    tcol = 'Elapsed Time ' if 'Elapsed Time ' in dma else 'Elapsed Time'
+    t_dma = dma[tcol].to_numpy(dtype=np.float64)
+    f_dma = dma[col].to_numpy(dtype=np.float64)
+    t_fea = data_in[:,0] - t_start              # Feather time on the DMA time base
+    r_fea = data_in[:,ch]
+    
+    # Time span covered by both streams
+    t_lo = max(t_dma[0], t_fea[0])
+    t_hi = min(t_dma[-1], t_fea[-1])
+    
+    if base == 'dma':
+        keep = slice(np.searchsorted(t_dma, t_lo, 'left'), np.searchsorted(t_dma, t_hi, 'right'))
+        time = t_dma[keep]
+        force = f_dma[keep]
+        resist = Sync_Resample(t_fea, r_fea, time, chunksize)
+    elif base == 'feather':
+        keep = slice(np.searchsorted(t_fea, t_lo, 'left'), np.searchsorted(t_fea, t_hi, 'right'))
+        time = t_fea[keep]
+        resist = r_fea[keep]
+        force = Sync_Resample(t_dma, f_dma, time, chunksize)
+    else:
+        time = t_lo + np.arange(int(np.floor((t_hi - t_lo) / base)) + 1) * base
+        resist = Sync_Resample(t_fea, r_fea, time, chunksize)
+        force = Sync_Resample(t_dma, f_dma, time, chunksize)
+    
+    return time, resist, force
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_LagEstimate(data_in,dma,ch,dt=0.05,col='Load   ',maxlag=None):
+    """
+    This FUNCTION estimates the time offset between a feather resistance channel and the DMA load
+    (t_start = feather time at which the DMA elapsed time is 0) by FFT cross-correlation. Both
+    signals are resampled onto grids with the same time step, normalized, and correlated. The peak
+    of the correlation is refined to a fraction of a time step with a parabola through its
+    neighbours. The peak of the absolute correlation is used, so resistance that drops under load
+    is also aligned.
+
+    INPUT:
+        data_in (Array)         ->      Array containing data from feather
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #
+        dma (Dataframe)         ->      DMA data for the same test
+        ch (Int)                ->      Resistance channel to align
+        dt (Float)              ->      Time step of the resampling grid in [s]
+        col (String)            ->      DMA column to align against (e.g. 'Load   ' or 'Disp     ')
+        maxlag (Float)          ->      Largest offset searched, in [s] (None = any)
+
+    OUTPUT:
+        t_start (Float)         ->      Estimated feather time at DMA elapsed time 0, in [s]
+    """
+    tcol = 'Elapsed Time ' if 'Elapsed Time ' in dma else 'Elapsed Time'
+    t_dma = dma[tcol].to_numpy(dtype=np.float64)
+    t_fea = data_in[:,0]
+    
+    # Resample both signals onto uniform grids with the same time step
+    g_fea = t_fea[0] + np.arange(int((t_fea[-1] - t_fea[0]) / dt) + 1) * dt
+    g_dma = t_dma[0] + np.arange(int((t_dma[-1] - t_dma[0]) / dt) + 1) * dt
+    r = np.interp(g_fea, t_fea, data_in[:,ch])
+    f = np.interp(g_dma, t_dma, dma[col].to_numpy(dtype=np.float64))
+    r = np.nan_to_num((r - np.nanmean(r)) / (np.nanstd(r) or 1))
+    f = np.nan_to_num((f - np.nanmean(f)) / (np.nanstd(f) or 1))
+    
+    # Cross-correlation c[m] = sum_k r[k+m] f[k]; negative lags wrap to the end of the array
+    n = len(r) + len(f) - 1
+    nfft = 1 << (n - 1).bit_length()
+    corr = np.fft.irfft(np.fft.rfft(r, nfft) * np.conj(np.fft.rfft(f, nfft)), nfft)
+    lags = np.concatenate((np.arange(len(r)), np.arange(-(len(f) - 1), 0)))
+    corr = np.abs(np.concatenate((corr[:len(r)], corr[nfft-(len(f)-1):])))
+    
+    # Time offset of each lag
+    offsets = g_fea[0] - g_dma[0] + lags * dt
+    if maxlag is not None:
+        corr[np.abs(offsets) > maxlag] = -np.inf
+    
+    # Sub-sample refinement with a parabola through the peak and its neighbours
+    i = int(np.argmax(corr))
+    shift = 0.0
+    if 0 < i < len(corr) - 1 and lags[i-1] == lags[i] - 1 and lags[i+1] == lags[i] + 1:
+        y0, y1, y2 = corr[i-1], corr[i], corr[i+1]
+        denom = y0 - 2*y1 + y2
+        if np.isfinite(denom) and denom != 0:
+            shift = 0.5 * (y0 - y2) / denom
+    
+    return float(offsets[i] + shift * dt)
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_LagEstimateBatch(rdata,dma,testparam,dt=0.05,col='Load   ',maxlag=None,workers=None):
+    """
+    This FUNCTION estimates the feather to DMA time offset of every sample in parallel (see
+    Feather_LagEstimate) and writes it into each sample's test parameters as t_start.
+
+    INPUT:
+        rdata (Dictionary)      ->      Key: (s) -> s = sample #
+                                        Value: Feather array (n,ch)
+        dma (Dictionary)        ->      Key: (s) -> s = sample #
+                                        Value: DMA dataframe (or a single dataframe shared by all samples)
+        testparam (Dictionary)  ->      Key: (s) -> s = sample #
+                                        Value: (ch,t_start,dur_cycle,cyclecount,...)
+                                            t_start is replaced by the estimated offset
+        dt (Float)              ->      Time step of the resampling grid in [s]
+        col (String)            ->      DMA column to align against
+        maxlag (Float)          ->      Largest offset searched, in [s] (None = any)
+        workers (Int)           ->      Number of worker processes (None = number of CPUs)
+
+    OUTPUT:
+        t_starts (Dictionary)   ->      Key: (s) -> s = sample #
+                                        Value: Estimated t_start
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for s in rdata:
+            dma_s = dma if isinstance(dma, pd.DataFrame) else dma[s]
+            futures[s] = pool.submit(Feather_LagEstimate, rdata[s], dma_s, testparam[s][0], dt, col, maxlag)
+        t_starts = {s: futures[s].result() for s in futures}
+    
+    # Write offsets into the test parameters, keeping each entry's type (tuple or list)
+    for s, t_start in t_starts.items():
+        param = list(testparam[s])
+        param[1] = t_start
+        testparam[s] = type(testparam[s])(param)
+    
+    return t_starts
+
+#-----------------------------------------------------------------------------------------------
+
 #===============================================================================================
 # Data Processing Functions
 #===============================================================================================
 
+@Profile_Staged
 def Feather_timefilter(data_in,t_start,duration):
     """
     This FUNCTION takes data and filters out data based on testing start time and test duration
@@ -237,33 +1283,85 @@ def Feather_timefilter(data_in,t_start,duration):
     
     # Set up
     t_end       = t_start + duration    # Adds the rough amount of time a test takes to the start time
-    n_sys       = np.size(data_in,0)    # Number of time steps
-    n_ch        = 5                     # Number of channels
+    t           = data_in[:,0]          # Channel 0 - Time
     
-    # Initialize 
-    i = 0
-    data_tmp = np.zeros([n_sys,n_ch])
+    # Extract relevant data (rows with time in range)
+    data_out = data_in[(t >= t_start) & (t <= t_end)]
     
-    # Extract relevant data
-    for n in range(0,n_sys):
-        t_current   = data_in[n,0]    # Takes current steps time
-        if t_current >= t_start and t_current <= t_end: # Checks if time is in range
-            data_tmp[i,0] = data_in[n,0]  # Channel 0 - Time           
-            data_tmp[i,1] = data_in[n,1]  # Channel 1 - Resistance
-            data_tmp[i,2] = data_in[n,2]  # Channel 2 - Resistance
-            data_tmp[i,3] = data_in[n,3]  # Channel 3 - Resistance
-            data_tmp[i,4] = data_in[n,4]  # Channel 4 - Resistance
-            i += 1  
+    return data_out
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_timewindow(data_in,t_start,duration):
+    """
+    This FUNCTION selects the rows of data within one or many time windows by binary search on the
+    time channel, returning views of the input (no data is copied). Time must be increasing. Rows
+    are kept when t_start <= time <= t_start + duration, as in Feather_timefilter.
     
-    # Delete redundant rows of data
-    redun = list(range(i,n_sys))
-    data_out = np.delete(data_tmp,redun,0)
+    Args:
+        data_in (Array)         ->      Array containing data from file
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #    
+        t_start (Float/Array)   ->      Start time of each window
+        duration (Float/Array)  ->      Duration of each window
+
+    Returns:
+        data_out (Array/List)   ->      View of data_in within the window, or a list of views
+                                        if t_start / duration are arrays
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #    
+    """
+    t_start = np.asarray(t_start, dtype=np.float64)
+    t_end   = t_start + np.asarray(duration, dtype=np.float64)
     
+    # Index range of each window
+    first = np.searchsorted(data_in[:,0], t_start, side='left')
+    last  = np.searchsorted(data_in[:,0], t_end, side='right')
     
-    return data_out
+    if first.ndim == 0:
+        return data_in[first:last]
+    
+    return [data_in[i:j] for i, j in zip(first.tolist(), last.tolist())]
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_timefilter_blocks(blocks,t_start,duration):
+    """
+    This FUNCTION is a generator version of Feather_timefilter that filters a stream of data blocks
+    (e.g. from Feather_StreamExtract) without building the full array. Time is assumed to be
+    increasing, so reading stops at the first block past the end of the test.
+    
+    Args:
+        blocks (Iterable)       ->      Iterable of arrays containing consecutive rows of data
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #    
+        t_start (Float)         ->      Start of testing time
+        duration (Float)        ->      Duration of test
+
+    Yields:
+        block (Array)           ->      Rows of each block within the test window
+                                            Key: (n,ch) 
+                                                - n  = n'th timestep
+                                                - ch = channel #    
+    """
+    t_end = t_start + duration    # Adds the rough amount of time a test takes to the start time
+    
+    for block in blocks:
+        t = block[:,0]
+        keep = (t >= t_start) & (t <= t_end)    # Checks if time is in range
+        if keep.any():
+            yield block[keep]
+        if len(t) > 0 and t[-1] > t_end:        # Remaining blocks are past the test window
+            break
 
 #-----------------------------------------------------------------------------------------------
 
+@Profile_Staged
 def Feather_cyclecut(data_in,t_start,dur_cycle,cyclecount):
     """
     This FUNCTION takes data from the feather board and seperates the data in each channel by a specified number of cycles
@@ -278,40 +1376,229 @@ def Feather_cyclecut(data_in,t_start,dur_cycle,cyclecount):
         cyclecount (Float)              ->      Number of cycles
 
     OUTPUTS:
-        data_out (Dictionary)           ->      Dictionary containing modified data from feather
+        data_out (Dictionary)           ->      Dictionary containing views of data from feather
                                                     Key:    (c) 
                                                             - c = Cycle #
                                                     Value:  (n,ch) 
                                                             - n  = n'th timstep
                                                             - ch = channel # 
     """
-    n_sys = np.size(data_in,0)                  # Number of time steps
-    n_ch  = 5                                   # Number of data channels
-    data_out = {}                               # Initialize final data dictionary
-        
-    for c in range(0,cyclecount):                   # Loop over cycles
-        data_tmp = np.zeros([n_sys,n_ch])         # Initialize temp array for storing data into dictionary
-        i=0
-        cycle_start = t_start + c*dur_cycle 
-        cycle_end   = t_start + (c+1)*dur_cycle    
-        for n in range(0,n_sys):                    # Loop over data points
-            t = data_in[n,0]
-            if cycle_start <= t < cycle_end:        # Check if time is within a cycle 
-                data_tmp[i,0] = data_in[n,0]   # Channel 0 - Time
-                data_tmp[i,1] = data_in[n,1]   # Channel 1 - Resistance
-                data_tmp[i,2] = data_in[n,2]   # Channel 2 - Resistance
-                data_tmp[i,3] = data_in[n,3]   # Channel 3 - Resistance
-                data_tmp[i,4] = data_in[n,4]   # Channel 4 - Resistance
-                i += 1   
-        redun = list(range(i,n_sys))
-        
-        if np.delete(data_tmp,redun,0).any():
-            data_out[c] = np.delete(data_tmp,redun,0)
+    # Cycles are found in one pass by Feather_CycleIndex; each value is a view of data_in
+    data_out = dict(Feather_CycleIndex(data_in,t_start,dur_cycle,cyclecount))
     
     return data_out
 
 #-----------------------------------------------------------------------------------------------
 
+class Feather_CycleIndex(collections.abc.Mapping):
+    """
+    This CLASS splits feather board data into cycles in one vectorized pass. Cycle boundaries are
+    found by binary search of the cycle edge times in the (increasing) time channel, and stored as
+    an offsets array; each cycle is a view into the original data. The index can be used as the
+    read only {cycle: array} dictionary returned by Feather_cyclecut (only cycles containing data
+    are keys), with cycle arrays only sliced out when accessed.
+    
+    INPUT:
+        data_in (Array)                 ->      Array containing data from file
+                                                    Key: (n,ch) 
+                                                        - n  = n'th timestep
+                                                        - ch = channel #    
+        t_start (Float)                 ->      Start of testing time
+        dur_cycle (Float)               ->      Duration of each cycle
+        cyclecount (Int)                ->      Number of cycles
+
+        edges (Array)                   ->      Cycle edge times, overrides t_start/dur_cycle/cyclecount
+                                                    (see from_edges)
+
+    ATTRIBUTES:
+        data (Array)                    ->      The input data (not copied)
+        edges (Array)                   ->      Cycle edge times, length cyclecount+1
+                                                    Cycle c holds rows with edges[c] <= time < edges[c+1]
+        offsets (Array)                 ->      Row index of each cycle edge, length cyclecount+1
+                                                    Cycle c is data[offsets[c]:offsets[c+1]]
+    """
+    
+    def __init__(self,data_in,t_start,dur_cycle,cyclecount,edges=None):
+        if edges is None:
+            edges = t_start + np.arange(cyclecount+1)*dur_cycle
+        self.data    = data_in
+        self.edges   = np.asarray(edges, dtype=np.float64)
+        self.offsets = np.searchsorted(data_in[:,0], self.edges, side='left')
+        self._keys   = np.flatnonzero(np.diff(self.offsets) > 0)     # Cycles containing data
+    
+    @classmethod
+    def from_edges(cls,data_in,edges):
+        """Builds the index from arbitrary (increasing) cycle edge times instead of a fixed cycle duration."""
+        return cls(data_in, None, None, None, edges=edges)
+    
+    @property
+    def counts(self):
+        return np.diff(self.offsets)        # Number of time steps in each cycle
+    
+    def cycle(self,c):
+        """Returns a view of the data of cycle c (empty if the cycle holds no data)."""
+        return self.data[self.offsets[c]:self.offsets[c+1]]
+    
+    def __getitem__(self,c):
+        if not isinstance(c, numbers.Integral):
+            raise KeyError(c)                   # Mapping's "in" and get() rely on KeyError
+        if not (0 <= c < len(self.offsets)-1) or self.offsets[c] == self.offsets[c+1]:
+            raise KeyError(c)
+        return self.cycle(c)
+    
+    def __iter__(self):
+        return iter(self._keys.tolist())
+    
+    def __len__(self):
+        return len(self._keys)
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def DMA_CycleDetect(data,col='Load   ',threshold=None,hysteresis=0.25):
+    """
+    FUNCTION that finds the start time of each real cycle in a DMA load or displacement signal.
+    A cycle starts where the signal rises through the threshold. To ignore noise near the threshold
+    the signal must first drop below threshold - band and then rise above threshold + band, where
+    band = hysteresis * (max - min) / 2. Each confirmed rise is then traced back to the last sample
+    at or below the threshold, and the start time is interpolated between it and the next sample.
+    All steps are vectorized, so runs of millions of points take milliseconds.
+
+    INPUT:
+        data        ->      Type:   Pandas Dataframe
+                            Value:  DMA data (from DMA_Extract_TF / DMA_Extract_TFD / DMA_FastExtract)
+        col         ->      Type:   String
+                            Value:  Column to detect cycles on (e.g. 'Load   ' or 'Disp     ')
+        threshold   ->      Type:   Float
+                            Value:  Crossing level (None = midpoint of signal range)
+        hysteresis  ->      Type:   Float
+                            Value:  Width of the dead band as a fraction of the half range
+
+    OUTPUT:
+        t_cycles    ->      Type:   Array
+                            Value:  Elapsed time of the start of each detected cycle
+    """
+    tcol = 'Elapsed Time ' if 'Elapsed Time ' in data else 'Elapsed Time'
+    time = data[tcol].to_numpy(dtype=np.float64)
+    sig  = data[col].to_numpy(dtype=np.float64)
+    if len(sig) == 0:
+        return np.zeros(0)
+    
+    lo, hi = np.nanmin(sig), np.nanmax(sig)
+    if threshold is None:
+        threshold = (lo + hi) / 2
+    band = hysteresis * (hi - lo) / 2
+    
+    # Schmitt trigger: state is 1 above the band, 0 below it, and holds its last value inside it
+    state = np.full(len(sig), -1, dtype=np.int8)
+    state[sig > threshold + band] = 1
+    state[sig < threshold - band] = 0
+    set_at = np.where(state >= 0, np.arange(len(sig)), 0)
+    np.maximum.accumulate(set_at, out=set_at)       # Index of the last sample outside the band
+    state = state[set_at]
+    
+    # Rising edges (a signal that starts high does not count as a cycle start)
+    rises = np.flatnonzero((state[1:] == 1) & (state[:-1] == 0)) + 1
+    
+    # Walk back from each rise to the last sample at or below the threshold (always after the drop
+    # below the band) and interpolate the threshold crossing between it and the next sample
+    below = np.where(sig <= threshold, np.arange(len(sig)), -1)
+    np.maximum.accumulate(below, out=below)
+    j = below[rises]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = (threshold - sig[j]) / (sig[j+1] - sig[j])
+    frac = np.where(np.isfinite(frac), np.clip(frac, 0, 1), 1.0)
+    
+    return time[j] + frac * (time[j+1] - time[j])
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_CycleDetect(data_in,dma,t_start=0.0,col='Load   ',threshold=None,hysteresis=0.25):
+    """
+    This FUNCTION splits feather board data into the real cycles of a test, found from the DMA
+    load or displacement signal (see DMA_CycleDetect), instead of a fixed cycle duration. The last
+    cycle ends one median cycle period after it starts (or at the end of the DMA data if sooner).
+    
+    INPUT:
+        data_in (Array)                 ->      Array containing data from file
+                                                    Key: (n,ch) 
+                                                        - n  = n'th timestep
+                                                        - ch = channel #    
+        dma (Dataframe)                 ->      DMA data for the same test
+        t_start (Float)                 ->      Feather time at which the DMA elapsed time is 0
+        col (String)                    ->      DMA column to detect cycles on
+        threshold (Float)               ->      Crossing level (None = midpoint of signal range)
+        hysteresis (Float)              ->      Width of the dead band as a fraction of the half range
+
+    OUTPUTS:
+        cycles (Feather_CycleIndex)     ->      Cycle index of the feather data (usable as {cycle: array})
+    """
+    t_cycles = DMA_CycleDetect(dma, col, threshold, hysteresis)
+    
+    if len(t_cycles) == 0:
+        edges = np.zeros(1)
+    else:
+        tcol = 'Elapsed Time ' if 'Elapsed Time ' in dma else 'Elapsed Time'
+        period = np.median(np.diff(t_cycles)) if len(t_cycles) > 1 else np.inf
+        t_end = min(t_cycles[-1] + period, dma[tcol].max())
+        edges = np.append(t_cycles, t_end)
+    
+    return Feather_CycleIndex.from_edges(data_in, edges + t_start)
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
+def Feather_CycleMetrics(cycles,channels=(1,2,3,4)):
+    """
+    This FUNCTION computes per cycle features of each resistance channel for every cycle at once,
+    using ufunc reductions over the cycle offsets of a Feather_CycleIndex (no loop over cycles).
+    
+    INPUT:
+        cycles (Feather_CycleIndex)     ->      Cycle index of the feather data
+        channels (List)                 ->      Resistance channels to compute features for
+
+    OUTPUTS:
+        metrics (Dataframe)             ->      Table with one row per cycle containing data
+                                                    Index:  Cycle #
+                                                    Key:    'Time'      = time of first step in cycle
+                                                            'Steps'     = number of time steps in cycle
+                                                            'R<ch> Max'   = peak resistance
+                                                            'R<ch> Min'   = minimum resistance
+                                                            'R<ch> Mean'  = mean resistance
+                                                            'R<ch> Range' = peak - minimum
+                                                            'R<ch> Drift' = last - first resistance of cycle
+    """
+    keys    = np.fromiter(cycles, dtype=np.intp)        # Cycles containing data
+    first   = cycles.offsets[keys]                      # First row of each cycle
+    last    = cycles.offsets[keys+1] - 1                # Last row of each cycle
+    counts  = last - first + 1
+    
+    # Reductions run over consecutive cycles, so restrict data to the span covered by cycles
+    base    = cycles.offsets[0]
+    data    = cycles.data[base:cycles.offsets[-1]]
+    starts  = first - base
+    
+    metrics = {'Time': cycles.data[first,0], 'Steps': counts}
+    if len(keys) > 0:
+        for ch in channels:
+            R = data[:,ch]
+            name = "R" + str(ch) + " "
+            metrics[name+'Max']   = np.maximum.reduceat(R, starts)
+            metrics[name+'Min']   = np.minimum.reduceat(R, starts)
+            metrics[name+'Mean']  = np.add.reduceat(R, starts) / counts
+            metrics[name+'Range'] = metrics[name+'Max'] - metrics[name+'Min']
+            metrics[name+'Drift'] = cycles.data[last,ch] - cycles.data[first,ch]
+    else:
+        for ch in channels:
+            for m in ('Max','Min','Mean','Range','Drift'):
+                metrics["R" + str(ch) + " " + m] = np.zeros(0)
+    
+    return pd.DataFrame(metrics, index=pd.Index(keys, name='Cycle'))
+
+#-----------------------------------------------------------------------------------------------
+
+@Profile_Staged
 def Feather_DeltaConvert(data_in):
     """
     This FUNCTION takes data and converts it to change in by taking the difference between each
@@ -353,4 +1640,32 @@ def Feather_DeltaConvert(data_in):
 
 #-----------------------------------------------------------------------------------------------
 
+@Profile_Staged
+def Feather_DeltaConvert_blocks(blocks):
+    """
+    This FUNCTION is a generator version of Feather_DeltaConvert that converts a stream of data
+    blocks to change in value from the first row of the first non-empty block.
+
+    Args:
+        blocks (Iterable)       ->      Iterable of arrays containing consecutive rows of data
+                                            Value: (n,ch) 
+                                                    - n  = timestep
+                                                    - ch = channel #   
+    Yields:
+        block (Array)           ->      Block of data relative to the initial entry
+                                            Value: (n,ch) 
+                                                    - n  = timestep
+                                                    - ch = channel #    
+    """
+    initial = None
+    
+    for block in blocks:
+        if len(block) == 0:
+            continue
+        if initial is None:
+            initial = block[0,:].copy()         # Initial value of each channel
+        yield np.subtract(block, initial)
+
+#-----------------------------------------------------------------------------------------------
+
 #-----------------------------------------------------------------------------------------------
\ No newline at end of file
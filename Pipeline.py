@@ -0,0 +1,492 @@
+#===============================================================================================
+# Pipeline Functions
+#===============================================================================================
+
+# Runs a whole test campaign (extract -> timefilter -> cyclecut -> DeltaConvert -> plots) from a
+# manifest as a dependency graph. Every node is fingerprinted from its stage, parameters, input
+# files and the fingerprints of the nodes it depends on, so a rerun only recomputes the nodes whose
+# inputs changed. Nodes whose inputs are ready run in parallel across worker processes.
+#
+# Manifest format (samples as in DataExtracter.Campaign_Manifest, other keys optional):
+#   {"output": "Report", "style": "mystyle.mplstyle", "cachedir": null,
+#    "plots": ["RvT_raw_plot", "RvT_comb_plot", ...],
+#    "samples": [{"sample": 1, "feather": "S1_B1.txt", "board": 1, "dma": "S1.csv", "dma_mode": "TFD",
+#                 "ch": 1, "t_start": 10.0, "dur_cycle": 60.0, "cyclecount": 5,
+#                 "include": true, "reason": ""}, ...]}
+#
+# Use as:
+#   python Pipeline.py campaign.json --workers 4
+
+# Imported Libraries
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import pickle
+import time
+import traceback
+
+import DataExtracter as DE
+import PlotFxns as PF
+
+PipelineVersion = 1             # Bump when stage outputs change, so every node is recomputed
+StateDir = ".pipeline"          # Node results and fingerprints, kept in the output directory
+
+# Plots made per sample: plot -> (data node needed, output subdirectory, output file suffix)
+SamplePlots = {'RvT_raw_plot':      ('raw',    "RvT",   "_RvT_raw_plot.png"),
+               'RvT_delta_plot':    ('delta',  "RvT",   "_RvT_delta_plot.png"),
+               'RvT_tfil_plot':     ('tfil',   "RvT",   "_RvT_tfil_plot.png"),
+               'RvT_cycle_plot':    ('cycles', "RvT",   "_RvT_cycle_plot.png"),
+               'RvFvT_raw_plot':    ('tfil',   "RvFvT", "_RvFvT_plot.png"),
+               'RvF_plot':          ('raw',    "RvF",   "_RvF_plot.png"),
+               'FvD_plot':          (None,     "FvD",   "_FvD_plot.png"),
+               'DvT_plot':          (None,     "DvT",   "_DvT_plot.png")}
+
+# Plots combining all samples: plot -> (data node needed, output subdirectory, last output file,
+# where {} is the number of samples for plots saving one cumulative snapshot per sample)
+CombPlots = {'RvT_comb_plot':       ('tfil',   "RvT",   "S{}_RvT_comb_plot.png"),
+             'RvT_combdelta_plot':  ('delta',  "RvT",   "S{}_RvT_combdelta_plot.png"),
+             'RvT_combraw_plot':    ('raw',    "RvT",   "RvT_combraw_plot.png"),
+             'RvFvT_comb_plot':     ('tfil',   "RvFvT", "Fin_RvFvT_comb_plot.png"),
+             'FvDvT_comb_plot':     (None,     "FvDvT", "FvDvT_comb_plot.png")}
+
+# testparam fields (ch, t_start, dur_cycle, cyclecount, include, reason) read by each combined plot:
+# plot -> (fields read for every sample, fields read for the first sample only)
+_CombFields = {'RvT_comb_plot':         ((0,), (2, 3)),
+               'RvT_combdelta_plot':    ((0,), (2, 3)),
+               'RvT_combraw_plot':      ((0,), ()),
+               'RvFvT_comb_plot':       ((0, 4, 5), ()),
+               'FvDvT_comb_plot':       ((), ())}
+
+_DMAPlots = ('RvFvT_raw_plot', 'RvF_plot', 'FvD_plot', 'DvT_plot', 'RvFvT_comb_plot', 'FvDvT_comb_plot')
+_TFDPlots = ('FvD_plot', 'DvT_plot', 'FvDvT_comb_plot')     # Need the displacement column
+
+#===============================================================================================
+# Manifest Functions
+#===============================================================================================
+
+def Pipeline_Manifest(source):
+    """
+    This FUNCTION reads a pipeline manifest. Samples are read with DataExtracter.Campaign_Manifest
+    and relative output and style paths are taken relative to the manifest's directory.
+
+    INPUT:
+        source (script)         ->      Raw Script of filepath of manifest file
+
+    OUTPUT:
+        manifest (Dictionary)   ->      'samples', 'output', 'style', 'cachedir' and 'plots' (see format above)
+    """
+    with open(source) as f:
+        manifest = json.load(f)
+    basedir = os.path.dirname(os.path.abspath(source))
+
+    manifest['samples'] = DE.Campaign_Manifest(source)
+    manifest['output'] = os.path.join(basedir, manifest.get('output', "."))
+    manifest['style'] = os.path.join(basedir, manifest['style']) if manifest.get('style') else PF.BaseStylePath
+    manifest.setdefault('cachedir', None)
+    manifest.setdefault('plots', list(SamplePlots) + list(CombPlots))
+
+    for entry in manifest['samples']:
+        missing = [key for key in ('feather', 'board', 'ch', 't_start', 'dur_cycle', 'cyclecount') if entry.get(key) is None]
+        if missing:
+            raise ValueError("Sample %s is missing %s in %s" % (entry['sample'], ", ".join(missing), source))
+        entry.setdefault('include', True)
+        entry.setdefault('reason', "")
+    unknown = [p for p in manifest['plots'] if p not in SamplePlots and p not in CombPlots]
+    if unknown:
+        raise ValueError("Unknown plot(s) %s in %s" % (", ".join(unknown), source))
+
+    return manifest
+
+#===============================================================================================
+# Graph Functions
+#===============================================================================================
+
+def Pipeline_Graph(manifest):
+    """
+    This FUNCTION builds the dependency graph of a campaign, holding only the nodes the requested
+    plots need.
+
+    INPUT:
+        manifest (Dictionary)   ->      Manifest from Pipeline_Manifest
+
+    OUTPUT:
+        graph (Dictionary)      ->      Key: node name (e.g. "tfil/S1", "plot/RvT_comb_plot")
+                                        Value: dictionary of
+                                            'stage'   = stage function name (see _Pipeline_Stages)
+                                            'params'  = JSON serializable parameters
+                                            'files'   = input files read by the node
+                                            'deps'    = {role: node name} of the nodes it needs
+                                            'outputs' = files the node writes (plots only)
+    """
+    graph = {}
+    plots = manifest['plots']
+    out, style = manifest['output'], manifest['style']
+    samples = sorted(manifest['samples'], key=lambda e: e['sample'])
+
+    for entry in samples:
+        n = "S%d" % entry['sample']
+        tp = {key: entry[key] for key in ('ch', 't_start', 'dur_cycle', 'cyclecount')}
+        graph["raw/" + n] = {'stage': 'extract', 'files': [entry['feather'], DE.BaseCalibrationPath], 'deps': {},
+                             'params': {'board': entry['board'], 'cachedir': manifest['cachedir']}}
+        graph["tfil/" + n] = {'stage': 'timefilter', 'files': [], 'deps': {'raw': "raw/" + n}, 'params': tp}
+        graph["cycles/" + n] = {'stage': 'cyclecut', 'files': [], 'deps': {'tfil': "tfil/" + n}, 'params': tp}
+        graph["delta/" + n] = {'stage': 'deltaconvert', 'files': [], 'deps': {'tfil': "tfil/" + n}, 'params': {}}
+        if entry.get('dma'):
+            graph["dma/" + n] = {'stage': 'dma', 'files': [entry['dma']], 'deps': {},
+                                 'params': {'mode': entry.get('dma_mode', 'TFD')}}
+
+        for plot in plots:
+            if plot not in SamplePlots or not _Pipeline_HasDMA(plot, [entry]):
+                continue
+            data, subdir, suffix = SamplePlots[plot]
+            deps = {data: data + "/" + n} if data is not None else {}
+            if plot in _DMAPlots:
+                deps['dma'] = "dma/" + n
+            params = {'plot': plot, 'name': n, 'output': out, 'style': style}
+            if plot not in _TFDPlots:
+                params['ch'] = entry['ch']              # Only the parameters a plot uses, so others don't rerun it
+            if plot == 'RvF_plot':
+                deps['raw'] = "raw/" + n
+                params['t_start'] = entry['t_start']
+            graph["plot/%s/%s" % (plot, n)] = {'stage': 'plot', 'files': [style], 'deps': deps,
+                                               'params': params,
+                                               'outputs': [PF.Plot_Path(out, subdir, n + suffix)]}
+
+    # Combined plots index samples 0..n-1 in sample order, as data_in / testparam do
+    for plot in plots:
+        if plot not in CombPlots or not samples or not _Pipeline_HasDMA(plot, samples):
+            continue
+        data, subdir, filename = CombPlots[plot]
+        deps = {}
+        for s, entry in enumerate(samples):
+            n = "S%d" % entry['sample']
+            if data is not None:
+                deps["%s/%d" % (data, s)] = data + "/" + n
+            if plot in _DMAPlots and (plot == 'FvDvT_comb_plot' or s == 0):     # RvFvT_comb_plot draws the first sample's force
+                deps["dma/%d" % s] = "dma/" + n
+        graph["plot/" + plot] = {'stage': 'plot', 'files': [style], 'deps': deps,
+                                 'params': {'plot': plot, 'count': len(samples), 'output': out, 'style': style,
+                                            'testparam': _Pipeline_TestParam(plot, samples)},
+                                 'outputs': [PF.Plot_Path(out, subdir, filename.format(len(samples)))]}
+
+    return _Pipeline_Prune(graph)
+
+def _Pipeline_Prune(graph):
+    """
+    This FUNCTION keeps only the plot nodes and the nodes they depend on, so data no requested plot
+    uses is never computed.
+    """
+    keep = set()
+    stack = [node for node, spec in graph.items() if spec['stage'] == 'plot']
+    while stack:
+        node = stack.pop()
+        if node not in keep:
+            keep.add(node)
+            stack.extend(graph[node]['deps'].values())
+    return {node: spec for node, spec in graph.items() if node in keep}
+
+def _Pipeline_TestParam(plot,samples):
+    """
+    This FUNCTION returns the testparam rows of a combined plot holding only the fields the plot
+    reads (others are None), so changing any other field does not rerun it.
+    """
+    every, first = _CombFields[plot]
+    if not every and not first:
+        return None
+    keys = ('ch', 't_start', 'dur_cycle', 'cyclecount', 'include', 'reason')
+    return [[e[key] if i in every or (s == 0 and i in first) else None for i, key in enumerate(keys)]
+            for s, e in enumerate(samples)]
+
+def _Pipeline_HasDMA(plot,entries):
+    """
+    This FUNCTION checks that every sample has the DMA data a plot needs.
+    """
+    if plot not in _DMAPlots:
+        return True
+    if plot == 'RvFvT_comb_plot':
+        entries = entries[:1]
+    return all(e.get('dma') and (plot not in _TFDPlots or e.get('dma_mode', 'TFD') == 'TFD') for e in entries)
+
+#-----------------------------------------------------------------------------------------------
+
+def _Pipeline_Order(graph):
+    """
+    This FUNCTION returns the node names with every node after the nodes it depends on.
+    """
+    order, done = [], set()
+
+    def visit(node, path):
+        if node in done:
+            return
+        if node in path:
+            raise ValueError("Dependency cycle through " + node)
+        for dep in graph[node]['deps'].values():
+            visit(dep, path | {node})
+        done.add(node)
+        order.append(node)
+
+    for node in graph:
+        visit(node, frozenset())
+    return order
+
+def _Pipeline_FileState(filepath):
+    if not os.path.exists(filepath):
+        return [os.path.abspath(filepath), None, None]     # The node reading it fails and is retried next run
+    stat = os.stat(filepath)
+    return [os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns]
+
+def Pipeline_Fingerprints(graph):
+    """
+    This FUNCTION fingerprints every node from its stage, parameters, input files (path, size and
+    modification time), the modules implementing the stage and the fingerprints of its dependencies.
+    A change anywhere upstream therefore changes the fingerprint of every node below it.
+
+    OUTPUT:
+        fingerprints (Dictionary)   ->  Key: node name, Value: hex digest
+    """
+    extract = [_Pipeline_FileState(DE.__file__)]
+    modules = {'plot': [_Pipeline_FileState(PF.__file__)] + extract}     # Plots also call DataExtracter (e.g. RvF_plot)
+    fingerprints = {}
+
+    for node in _Pipeline_Order(graph):
+        spec = graph[node]
+        key = {'version': PipelineVersion,
+               'stage': spec['stage'],
+               'params': spec['params'],
+               'files': [_Pipeline_FileState(f) for f in spec['files']],
+               'modules': modules.get(spec['stage'], extract),
+               'deps': {role: fingerprints[dep] for role, dep in sorted(spec['deps'].items())}}
+        fingerprints[node] = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    return fingerprints
+
+#===============================================================================================
+# Stage Functions
+#===============================================================================================
+
+def _Stage_Extract(p,inputs,files):
+    return DE.Feather_DataExtract(files[0], p['board'], calibpath=files[1], cachedir=p['cachedir'])
+
+def _Stage_DMA(p,inputs,files):
+    if p['mode'] == 'TF':
+        return DE.DMA_Extract_TF(files[0])
+    return DE.DMA_Extract_TFD(files[0])
+
+def _Stage_TimeFilter(p,inputs,files):
+    return DE.Feather_timefilter(inputs['raw'], p['t_start'], p['dur_cycle'] * p['cyclecount'])
+
+def _Stage_CycleCut(p,inputs,files):
+    return DE.Feather_cyclecut(inputs['tfil'], p['t_start'], p['dur_cycle'], p['cyclecount'])
+
+def _Stage_DeltaConvert(p,inputs,files):
+    return DE.Feather_DeltaConvert(inputs['tfil'])
+
+def _Stage_Plot(p,inputs,files):
+    plot, out = p['plot'], p['output']
+    func = getattr(PF, plot)
+    kw = {'stylepath': p['style']}
+
+    if plot in CombPlots:
+        data = CombPlots[plot][0]
+        rdata = {s: inputs["%s/%d" % (data, s)] for s in range(p['count'])} if data is not None else None
+        testparam = {s: tuple(tp) for s, tp in enumerate(p['testparam'] or [])}
+        if plot == 'RvFvT_comb_plot':
+            dma = inputs["dma/0"]
+            return func(rdata, dma['Elapsed Time '], dma['Load   '], testparam, out, **kw)
+        if plot == 'FvDvT_comb_plot':
+            return func({s: inputs["dma/%d" % s] for s in range(p['count'])}, out, **kw)
+        return func(rdata, testparam, out, **kw)
+
+    ch, name = p.get('ch'), p['name']
+    if plot == 'RvT_raw_plot':
+        return func(inputs['raw'][:,0], inputs['raw'][:,ch], ch, name, out, **kw)
+    if plot in ('RvT_delta_plot', 'RvT_tfil_plot'):
+        data = inputs[SamplePlots[plot][0]]
+        return func(data[:,0], data[:,ch], name, out, **kw)
+    if plot == 'RvT_cycle_plot':
+        return func(inputs['cycles'], ch, name, out, **kw)
+    if plot == 'RvFvT_raw_plot':
+        dma = inputs['dma']
+        return func(inputs['tfil'][:,0], inputs['tfil'][:,ch], dma['Elapsed Time '], dma['Load   '], name, out, **kw)
+    if plot == 'RvF_plot':
+        stime, resist, force = DE.Feather_DMA_Sync(inputs['raw'], inputs['dma'], ch, p['t_start'])
+        return func(force, resist, name, out, **kw)
+    if plot == 'FvD_plot':
+        return func(inputs['dma']['Disp     '], inputs['dma']['Load   '], name, out, **kw)
+    if plot == 'DvT_plot':
+        return func(inputs['dma']['Elapsed Time '], inputs['dma']['Disp     '], name, out, **kw)
+
+_Pipeline_Stages = {'extract':      _Stage_Extract,
+                    'dma':          _Stage_DMA,
+                    'timefilter':   _Stage_TimeFilter,
+                    'cyclecut':     _Stage_CycleCut,
+                    'deltaconvert': _Stage_DeltaConvert,
+                    'plot':         _Stage_Plot}
+
+#-----------------------------------------------------------------------------------------------
+
+def _Pipeline_Init():
+    """
+    This FUNCTION sets up a pipeline worker process with the headless Agg backend.
+    """
+    PF.matplotlib.use('Agg')
+
+def _Pipeline_Job(stage,params,files,deppaths,resultpath):
+    """
+    This FUNCTION runs one node in a worker process. Dependency results are read from, and the
+    node's result written to, the state directory so large arrays never go through the pool.
+    """
+    t0 = time.perf_counter()
+    inputs = {}
+    for role, path in deppaths.items():
+        with open(path, 'rb') as f:
+            inputs[role] = pickle.load(f)
+
+    try:
+        result = _Pipeline_Stages[stage](params, inputs, files)
+    finally:
+        if stage == 'plot':
+            PF._Plot_Cleanup()
+
+    if resultpath is not None:
+        with DE.File_Atomic(resultpath) as tmppath, open(tmppath, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return time.perf_counter() - t0
+
+#===============================================================================================
+# Runner Functions
+#===============================================================================================
+
+def Pipeline_Run(source,workers=None,force=False,log=print):
+    """
+    This FUNCTION runs a campaign manifest, recomputing only the nodes whose fingerprint changed
+    (or whose result or plot file is missing) and running independent nodes in parallel. A node
+    that fails is reported and the nodes depending on it are skipped; the rest still run.
+
+    INPUT:
+        source (script)         ->      Raw Script of filepath of manifest file
+        workers (Int)           ->      Number of worker processes (None = number of CPUs)
+        force (Bool)            ->      Recompute every node
+        log (Function)          ->      Called with a line per finished node (None = quiet)
+
+    OUTPUT:
+        results (Dictionary)    ->      Key: node name
+                                        Value: dictionary of
+                                            'status' = 'ran', 'cached', 'failed' or 'skipped'
+                                            'time'   = run time in [s] (None unless ran)
+                                            'error'  = traceback of the error raised (None unless failed)
+    """
+    manifest = Pipeline_Manifest(source)
+    graph = Pipeline_Graph(manifest)
+    fingerprints = Pipeline_Fingerprints(graph)
+
+    statedir = os.path.join(manifest['output'], StateDir)
+    os.makedirs(statedir, exist_ok=True)
+    statepath = os.path.join(statedir, "state.json")
+    state = {}
+    if os.path.exists(statepath) and not force:
+        with open(statepath) as f:
+            state = json.load(f)
+
+    def resultpath(node):
+        return None if graph[node]['stage'] == 'plot' else os.path.join(statedir, fingerprints[node] + ".pkl")
+
+    def current(node):
+        if state.get(node) != fingerprints[node]:
+            return False
+        outputs = graph[node].get('outputs') or [resultpath(node)]
+        return all(os.path.exists(path) for path in outputs)
+
+    results = {}
+    pending = {}
+    for node in _Pipeline_Order(graph):
+        if current(node):
+            results[node] = {'status': 'cached', 'time': None, 'error': None}
+        else:
+            pending[node] = set(graph[node]['deps'].values())
+
+    # Nodes are submitted once their dependencies have finished (cached results are read back from
+    # the state directory by the worker). Pending nodes are in dependency order, so one pass also
+    # skips every node below a failure.
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_Pipeline_Init) as pool:
+        running = {}
+
+        def submit_ready():
+            for node in list(pending):
+                deps = pending[node]
+                if any(results.get(d, {}).get('status') in ('failed', 'skipped') for d in deps):
+                    del pending[node]
+                    results[node] = {'status': 'skipped', 'time': None, 'error': None}
+                    _Pipeline_Log(log, node, results[node])
+                elif all(d in results for d in deps):
+                    del pending[node]
+                    spec = graph[node]
+                    deppaths = {role: resultpath(dep) for role, dep in spec['deps'].items()}
+                    running[pool.submit(_Pipeline_Job, spec['stage'], spec['params'], spec['files'],
+                                        deppaths, resultpath(node))] = node
+
+        submit_ready()
+        while running:
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    results[node] = {'status': 'ran', 'time': future.result(), 'error': None}
+                    state[node] = fingerprints[node]
+                except Exception:
+                    results[node] = {'status': 'failed', 'time': None, 'error': traceback.format_exc()}
+                    state.pop(node, None)
+                _Pipeline_Log(log, node, results[node])
+            _Pipeline_SaveState(statepath, state)     # Keep finished nodes if the run is stopped
+            submit_ready()
+
+    _Pipeline_SaveState(statepath, {node: fp for node, fp in state.items() if node in graph})
+    Pipeline_Clean(statedir, fingerprints)
+    return results
+
+def _Pipeline_Log(log,node,result):
+    if log is None:
+        return
+    if result['status'] == 'ran':
+        log("%-8s %-40s %.2f s" % ('ran', node, result['time']))
+    elif result['status'] == 'failed':
+        log("%-8s %-40s %s" % ('FAILED', node, result['error'].strip().splitlines()[-1]))
+    else:
+        log("%-8s %s" % (result['status'], node))
+
+def _Pipeline_SaveState(statepath,state):
+    with DE.File_Atomic(statepath) as tmppath, open(tmppath, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+def Pipeline_Clean(statedir,fingerprints):
+    """
+    This FUNCTION deletes stored node results that no current node refers to.
+
+    OUTPUT:
+        removed (List)          ->      File paths of the deleted results
+    """
+    keep = {fp + ".pkl" for fp in fingerprints.values()}
+    removed = []
+    for name in os.listdir(statedir):
+        if (name.endswith(".pkl") or name.endswith(".part")) and name not in keep:
+            os.remove(os.path.join(statedir, name))
+            removed.append(os.path.join(statedir, name))
+    return removed
+
+#-----------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a test campaign manifest, rebuilding only what changed.")
+    parser.add_argument('manifest')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="recompute every node")
+    args = parser.parse_args()
+
+    results = Pipeline_Run(args.manifest, args.workers, args.force)
+    counts = {}
+    for r in results.values():
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+    print(", ".join("%d %s" % (n, status) for status, n in sorted(counts.items())))
+    raise SystemExit(1 if counts.get('failed') else 0)
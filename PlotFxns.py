@@ -7,18 +7,927 @@
 # Reference: https://matplotlib.org/stable/users/explain/quick_start.html#coding-styles
 
 # Package Initialization
-import matplotlib.pyplot as plt
-from matplotlib.offsetbox import AnchoredText
-from matplotlib.ticker import AutoMinorLocator, MultipleLocator
+import concurrent.futures
+import collections.abc
+import functools
+import hashlib
+import importlib
+import inspect
+import io
+import json
+import os
+import queue
+import threading
+import time as _time
+import traceback
 import numpy as np
 
-BaseStylePath = r"C:\Users\Aiden\OneDrive - Carleton University\Materials as Machines Lab\Current Research\Aiden\Work\Testing Data\mystyle.mplstyle"
+from Profiling import Profile_Staged    # Opt-in stage timing (see Profiling.py)
+
+class _LazyModule:
+    """
+    Stand-in for a module that is only imported the first time one of its attributes is used, so
+    importing PlotFxns does not load matplotlib (or pick a GUI backend) until something is plotted.
+    """
+    def __init__(self,name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self,attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+matplotlib  = _LazyModule("matplotlib")
+plt         = _LazyModule("matplotlib.pyplot")
+offsetbox   = _LazyModule("matplotlib.offsetbox")
+mimage      = _LazyModule("matplotlib.image")
+mtransforms = _LazyModule("matplotlib.transforms")
+backend_agg = _LazyModule("matplotlib.backends.backend_agg")
+
+DecimatePoints = 20000    # Max points drawn per line by Plot_Decimate (None = draw every point)
+
+BaseStylePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mystyle.mplstyle")
+
+#====================================================
+# Plot Helper Functions
+#====================================================
+
+def Plot_Decimate(x,y,n_points=None):
+    """
+    This FUNCTION reduces a line to at most n_points points before plotting while keeping its
+    visual shape. The end points are kept, the samples between them are split into (n_points-2)/2
+    consecutive buckets and the minimum and maximum of y in each bucket are kept (in their original
+    order), so peaks are never lost. The rendering cost then stops growing with the number of samples.
+    Lines whose x values are not monotonic (e.g. loops) are returned whole, as buckets of consecutive
+    samples would then mix distant parts of the line.
+
+    Input:
+        x           ->      [Array]
+                            1D Array of x values
+                            
+        y           ->      [Array]
+                            1D Array of y values
+        
+        n_points    ->      [Int]
+                            Max number of points kept, at least 2 (None = DecimatePoints, 0 = every point)
+    Output:
+        x, y        ->      [Array]
+                            Decimated x and y values
+    """
+    if n_points is None:
+        n_points = DecimatePoints
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if not n_points or n <= n_points:
+        return x, y
+    if n_points < 2:
+        raise ValueError("n_points must be at least 2 (the end points are always kept), got " + str(n_points))
+    dx = np.diff(x)
+    if not (np.all(dx >= 0) or np.all(dx <= 0)):
+        return x, y                                 # x is not monotonic (e.g. force vs displacement), so
+                                                    # consecutive samples may be far apart on the plot
+    
+    # The end points are always kept so the line spans the same range, and the samples between
+    # them are split into at most (n_points-2)/2 buckets of two points each
+    n_buckets = (n_points - 2) // 2
+    if n_buckets == 0:
+        idx = np.array([0, n-1])
+        return x[idx], y[idx]
+    m = n - 2                                       # Samples between the end points
+    size = int(np.ceil(m / n_buckets))              # Samples per bucket
+    
+    # Min and max of each full bucket
+    n_full = m // size
+    yb = y[1:1+n_full*size].reshape(n_full, size)
+    imin = yb.argmin(axis=1)
+    imax = yb.argmax(axis=1)
+    start = 1 + np.arange(n_full) * size
+    idx = np.column_stack((start + np.minimum(imin, imax), start + np.maximum(imin, imax))).ravel()
+    
+    # Partial last bucket
+    if n_full*size < m:
+        tail = y[1+n_full*size:n-1]
+        idx = np.concatenate((idx, 1 + n_full*size + np.sort([tail.argmin(), tail.argmax()])))
+    
+    idx = np.concatenate(([0], idx, [n-1]))
+    
+    return x[idx], y[idx]
+
+#----------------------------------------------------
+
+def _Plot_StyleParams(stylepath):
+    """
+    This FUNCTION parses a matplotlib style file once and caches its rcParams until the file changes.
+    """
+    stat = os.stat(stylepath)
+    return _Plot_StyleFile(os.path.abspath(stylepath), stat.st_size, stat.st_mtime_ns)
+
+@functools.lru_cache(maxsize=32)
+def _Plot_StyleFile(stylepath,size,mtime):
+    return matplotlib.rc_params_from_file(stylepath, use_default_template=False)
+
+def Plot_UseStyle(stylepath):
+    """
+    This FUNCTION applies a matplotlib style file (same effect as plt.style.use), parsing the file
+    only when it is first used or has changed.
+
+    Input:
+        stylepath   ->      [String]
+                            File path of the .mplstyle file
+    """
+    plt.rcParams.update(_Plot_StyleParams(stylepath))
+
+def Plot_Style(stylepath):
+    """
+    This FUNCTION returns a context manager that applies a matplotlib style file (parsed once and
+    cached until it changes) inside a with block and restores the previous rcParams afterwards.
+
+    Input:
+        stylepath   ->      [String]
+                            File path of the .mplstyle file (None = keep current style)
+    """
+    if stylepath is None:
+        return plt.rc_context()
+    return plt.rc_context(_Plot_StyleParams(stylepath))
+
+def _Plot_Styled(func):
+    """
+    This DECORATOR runs a plotting function inside Plot_Style(stylepath), using the function's
+    own stylepath argument, and records it as a profiling stage (see Profiling.py). Inside a
+    Plot_Cache block a call whose inputs match an earlier call with intact outputs is skipped.
+    """
+    sig = inspect.signature(func)
+    staged = Profile_Staged(func)
+    
+    @functools.wraps(func)
+    def wrapper(*args,**kwargs):
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        
+        if not _Plot_Caches:
+            with Plot_Style(bound.arguments['stylepath']):
+                return staged(*args, **kwargs)
+        
+        cache = _Plot_Caches[-1]
+        key = Plot_CacheKey(func.__name__, bound.arguments)
+        if cache.hit(key):
+            return None
+        
+        _Plot_Saved.append([])
+        try:
+            with Plot_Style(bound.arguments['stylepath']):
+                result = staged(*args, **kwargs)
+        finally:
+            outputs = _Plot_Saved.pop()
+        cache.store(key, func.__name__, outputs)
+        return result
+    
+    return wrapper
+
+#----------------------------------------------------
+
+def _Plot_BatchInit(stylepath):
+    """
+    This FUNCTION sets up a batch rendering worker: headless Agg backend and the style loaded once.
+    """
+    matplotlib.use('Agg')
+    if stylepath is not None:
+        Plot_UseStyle(stylepath)
+
+def _Plot_BatchJob(func,args,kwargs):
+    """
+    This FUNCTION renders one plot job in a worker, returning its run time or the error raised.
+    """
+    t0 = _time.perf_counter()
+    try:
+        func(*args, **kwargs)
+        return None, _time.perf_counter() - t0
+    except Exception:
+        return traceback.format_exc(), _time.perf_counter() - t0
+    finally:
+        _Plot_Cleanup()
+
+def _Plot_Cleanup():
+    """
+    This FUNCTION closes every open figure after a plot job, so figures left by a failed job never
+    leak into the next one.
+    """
+    plt.close('all')
+
+def _Plot_TakesStyle(func,args,kwargs):
+    """
+    This FUNCTION checks whether a plot job's function has a stylepath argument the job leaves unset.
+    """
+    try:
+        sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        return False
+    if 'stylepath' not in sig.parameters:
+        return False
+    try:
+        return 'stylepath' not in sig.bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        return False                                # Bad arguments, reported when the job runs
+
+@Profile_Staged
+def Plot_Batch(jobs,workers=None,stylepath=BaseStylePath):
+    """
+    This FUNCTION renders many plots across a pool of worker processes using the headless Agg
+    backend. Each worker loads the style once, and it is passed as stylepath to every job whose
+    function takes one and does not set its own. A job that fails is reported and does not stop
+    the other jobs.
+
+    Input:
+        jobs        ->      [List]
+                            List of plot jobs, each a dictionary
+                                'func'   = plotting function (e.g. RvT_raw_plot)
+                                'args'   = tuple of positional arguments
+                                'kwargs' = dictionary of keyword arguments (optional)
+                                'path'   = output directory, passed as savepath (optional)
+        
+        workers     ->      [Int]
+                            Number of worker processes (None = number of CPUs)
+        
+        stylepath   ->      [String]
+                            Style file loaded by each worker and used by jobs without their own
+                            stylepath (None = each job uses its function's default)
+    Output:
+        results     ->      [List]
+                            One dictionary per job, in job order
+                                'func'  = name of plotting function
+                                'ok'    = True if the plot was saved
+                                'error' = traceback of the error raised (None if ok)
+                                'time'  = run time in [s]
+    """
+    results = [None] * len(jobs)
+    
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_Plot_BatchInit,
+                                                initargs=(stylepath,)) as pool:
+        futures = {}
+        for i, job in enumerate(jobs):
+            args, kwargs = tuple(job.get('args', ())), dict(job.get('kwargs', {}))
+            if 'path' in job:
+                kwargs['savepath'] = job['path']
+            if stylepath is not None and _Plot_TakesStyle(job['func'], args, kwargs):
+                kwargs['stylepath'] = stylepath     # Plotting functions re-apply their own default style
+            futures[pool.submit(_Plot_BatchJob, job['func'], args, kwargs)] = i
+        
+        for future in concurrent.futures.as_completed(futures):
+            i = futures[future]
+            name = getattr(jobs[i]['func'], '__name__', str(jobs[i]['func']))
+            try:
+                error, runtime = future.result()
+            except Exception:
+                error, runtime = traceback.format_exc(), None    # Worker died or job could not be sent
+            results[i] = {'func': name, 'ok': error is None, 'error': error, 'time': runtime}
+    
+    return results
+
+#----------------------------------------------------
+
+@Profile_Staged
+def Plot_Progressive(fig,steps,pad_inches=0.1):
+    """
+    This FUNCTION saves a series of cumulative snapshots of one figure (S1, S1+S2, ...) while
+    rasterizing each line only once. The layout and canvas are fixed from the last snapshot, the
+    static parts of the figure are drawn once, and each step restores the cached background, draws
+    only its new artists and keeps the result as the next background. Artists that change every
+    step (legends, text boxes) are drawn on top per snapshot and the image is cropped like
+    bbox_inches='tight', so the total cost grows linearly with the number of snapshots.
+
+    Input:
+        fig         ->      [Figure]
+                            Figure with the artists of every step already added and final axis limits
+        
+        steps       ->      [List]
+                            One tuple per snapshot, in order
+                                (artists, overlay, path)
+                                    artists = list of artists first shown in this snapshot (kept afterwards)
+                                    overlay = function adding the artists shown in this snapshot only and
+                                              returning them as a list (None = no overlay)
+                                    path    = file path the snapshot is saved under
+        
+        pad_inches  ->      [Float]
+                            Padding around each cropped snapshot in [in]
+    Output:
+        Saves one png per step.
+    """
+    if len(steps) == 0:
+        return
+    
+    for artists, overlay, path in steps:
+        for a in artists:
+            a.set_animated(True)    # Left out of full draws, only drawn onto the background once
+    
+    if isinstance(fig.canvas, backend_agg.FigureCanvasAgg):
+        canvas = fig.canvas
+    else:
+        canvas = backend_agg.FigureCanvasAgg(fig)
+    
+    dpi = plt.rcParams['savefig.dpi']
+    if dpi != 'figure':
+        fig.set_dpi(dpi)
+    
+    # Fix layout and canvas size from the last (largest) snapshot
+    shown = _Plot_Overlay(steps[-1][1])
+    canvas.draw()
+    fig.set_layout_engine('none')
+    bbox = fig.get_tightbbox(canvas.get_renderer()).padded(pad_inches)
+    for a in shown:
+        a.remove()
+    
+    W, H = fig.get_size_inches()
+    for ax in fig.axes:
+        pos = ax.get_position()
+        ax.set_position([(pos.x0*W - bbox.x0)/bbox.width, (pos.y0*H - bbox.y0)/bbox.height,
+                         pos.width*W/bbox.width, pos.height*H/bbox.height])
+    fig.set_size_inches(bbox.width, bbox.height)
+    
+    # Static background
+    canvas.draw()
+    renderer = canvas.get_renderer()
+    static = fig.get_tightbbox(renderer).transformed(fig.dpi_scale_trans)
+    background = canvas.copy_from_bbox(fig.bbox)
+    pad = pad_inches * fig.dpi
+    
+    for artists, overlay, path in steps:
+        canvas.restore_region(background)
+        for a in artists:
+            fig.draw_artist(a)
+        background = canvas.copy_from_bbox(fig.bbox)
+        
+        extent = [static]
+        shown = _Plot_Overlay(overlay)
+        for a in shown:
+            fig.draw_artist(a)
+            extent.append(a.get_tightbbox(renderer))
+        for a in shown:
+            a.remove()
+        
+        # Crop to the tight bounding box (display origin is bottom left, image rows start at the top)
+        image = np.asarray(canvas.buffer_rgba())
+        h, w = image.shape[:2]
+        box = mtransforms.Bbox.union(extent)
+        x0, x1 = max(int(np.floor(box.x0 - pad)), 0), min(int(np.ceil(box.x1 + pad)), w)
+        y0, y1 = max(int(np.floor(h - box.y1 - pad)), 0), min(int(np.ceil(h - box.y0 + pad)), h)
+        Plot_SaveImage(image[y0:y1, x0:x1], path, dpi=fig.dpi)
+
+def _Plot_Overlay(overlay):
+    """
+    This FUNCTION adds a Plot_Progressive overlay to its figure and returns the artists it added.
+    """
+    if overlay is None:
+        return []
+    return list(overlay())
+
+def Plot_LegendOverlay(ax,handles,extras=(),**legend_kw):
+    """
+    This FUNCTION returns a Plot_Progressive overlay that adds a legend of the given lines plus any
+    extra artists (e.g. a text box) to an axis for one snapshot.
+
+    Input:
+        ax          ->      [Axes]
+                            Axis the legend and extra artists belong to
+        
+        handles     ->      [List]
+                            Lines shown in the legend (empty = no legend)
+        
+        extras      ->      [List]
+                            Extra artists added to the axis
+        
+        legend_kw   ->      Keyword arguments passed to ax.legend
+    """
+    handles, extras = list(handles), list(extras)
+    
+    def overlay():
+        shown = [ax.add_artist(a) for a in extras]
+        if len(handles) > 0:
+            shown.append(ax.legend(handles=handles, **legend_kw))
+        return shown
+    
+    return overlay
+
+#----------------------------------------------------
+
+#====================================================
+# Output Functions
+#====================================================
+
+_Plot_Sinks = []    # Active Plot_Writer objects, innermost last
+_Plot_Caches = []   # Active Plot_Cache objects, innermost last
+_Plot_Saved = []    # Output paths saved by each running cached plot call
+
+def Plot_Path(savepath,subdir,filename):
+    """
+    This FUNCTION builds the output path of a plot, savepath/Plots/<subdir>/<filename>, using the
+    path separator of the running system.
+    """
+    return os.path.join(savepath, "Plots", subdir, filename)
+
+@Profile_Staged
+def Plot_Save(fig,path,**kwargs):
+    """
+    This FUNCTION saves a figure as a png. Inside a Plot_Writer block the figure is only rendered
+    here and its encoding and writing are left to the writer thread, otherwise it is saved directly.
+    Missing output directories are created.
+
+    Input:
+        fig         ->      [Figure]
+                            Figure to save
+        
+        path        ->      [String]
+                            File path the figure is saved under
+        
+        kwargs      ->      Keyword arguments passed to fig.savefig (default bbox_inches='tight', pad_inches=0.1)
+    """
+    kwargs.setdefault('bbox_inches', 'tight')
+    kwargs.setdefault('pad_inches', 0.1)
+    for saved in _Plot_Saved:
+        saved.append(path)
+    
+    if _Plot_Sinks:
+        _Plot_Sinks[-1].savefig(fig, path, **kwargs)
+    else:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fig.savefig(path, **kwargs)
+
+@Profile_Staged
+def Plot_SaveImage(image,path,**kwargs):
+    """
+    This FUNCTION saves an RGBA image array as a png (through the active Plot_Writer if there is one).
+
+    Input:
+        image       ->      [Array]
+                            (height, width, 4) array of uint8 pixels
+        
+        path        ->      [String]
+                            File path the image is saved under
+        
+        kwargs      ->      Keyword arguments passed to matplotlib.image.imsave (e.g. dpi)
+    """
+    for saved in _Plot_Saved:
+        saved.append(path)
+    
+    if _Plot_Sinks:
+        _Plot_Sinks[-1].imsave(image, path, **kwargs)
+    else:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        mimage.imsave(path, image, **kwargs)
+
+def _Plot_WriteBytes(data,path):
+    """
+    This FUNCTION writes an already encoded file to disk.
+    """
+    with open(path, 'wb') as f:
+        f.write(data)
+
+#----------------------------------------------------
+
+class Plot_Writer:
+    """
+    This CLASS moves png encoding and disk output off the plotting thread. Figures are rendered into
+    in-memory RGBA buffers when saved, and background threads encode and write them while the next
+    figure is being computed. The queue is bounded, so plotting waits instead of holding
+    an unlimited number of images in memory.
+
+    Input:
+        maxsize     ->      [Int]
+                            Maximum number of rendered images waiting to be written
+        
+        threads     ->      [Int]
+                            Number of writer threads
+    
+    Use as:
+        with Plot_Writer() as writer:       # All PlotFxns saves inside the block go through the writer
+            for s in samples:
+                RvT_raw_plot(time[s], resist[s], ch, names[s], savepath)
+            errors = writer.flush()         # Wait for every queued image, [(path, traceback), ...]
+    
+    Leaving the block waits for the remaining images and raises an OSError if any failed to write.
+    """
+    
+    def __init__(self,maxsize=4,threads=1):
+        self.queue = queue.Queue(maxsize)
+        self.errors = []
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(threads)]
+        for thread in self._threads:
+            thread.start()
+    
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                path, func, args, kwargs = job
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                func(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.errors.append((path, traceback.format_exc()))
+            finally:
+                self.queue.task_done()
+    
+    def savefig(self,fig,path,**kwargs):
+        """
+        Renders a figure into memory now and queues its png encoding and writing (see fig.savefig
+        for the keyword arguments).
+        """
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='rgba', **kwargs)
+        renderer = getattr(fig.canvas, 'renderer', None)    # Agg renderer the buffer was drawn with
+        data = buffer.getvalue()
+        
+        if renderer is not None and len(data) == renderer.width * renderer.height * 4:
+            image = np.frombuffer(data, dtype=np.uint8).reshape(renderer.height, renderer.width, 4)
+            self.queue.put((path, mimage.imsave, (path, image), {'dpi': renderer.dpi}))
+        else:   # Not drawn by Agg, encode here and only write in the background
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', **kwargs)
+            self.queue.put((path, _Plot_WriteBytes, (buffer.getvalue(), path), {}))
+    
+    def imsave(self,image,path,**kwargs):
+        """
+        Queues an RGBA image array to be encoded and written (see matplotlib.image.imsave for the
+        keyword arguments). The array is copied, so the caller may reuse it.
+        """
+        self.queue.put((path, mimage.imsave, (path, np.array(image)), kwargs))
+    
+    def flush(self):
+        """
+        Waits until every queued image is written and returns the errors since the last flush as a
+        list of (path, traceback).
+        """
+        self.queue.join()
+        with self._lock:
+            errors, self.errors = self.errors, []
+        return errors
+    
+    def close(self):
+        """
+        Flushes the queue, stops the writer threads and returns the remaining errors.
+        """
+        errors = self.flush()
+        for thread in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        return errors
+    
+    def __enter__(self):
+        _Plot_Sinks.append(self)
+        return self
+    
+    def __exit__(self,*exc):
+        _Plot_Sinks.remove(self)
+        errors = self.close()
+        if errors and exc[0] is None:
+            raise OSError("Failed to write %d plot(s), first: %s\n%s" % (len(errors), *errors[0]))
+
+#----------------------------------------------------
+
+#====================================================
+# Plot Cache
+#====================================================
+
+PlotCacheVersion = 1    # Bump when plot output changes without a change in inputs, so every plot is redrawn
+
+def _Plot_Hash(h,obj):
+    """
+    This FUNCTION feeds a plot argument into a hash: arrays by dtype, shape and raw data, dataframes
+    by column names and values, dictionaries and lists item by item, other values by repr.
+    """
+    if isinstance(obj, np.ndarray) or (hasattr(obj, '__array__') and not hasattr(obj, 'to_numpy')):
+        obj = np.asarray(obj)
+        if obj.dtype.hasobject:
+            h.update(repr(obj.tolist()).encode())
+            return
+        h.update(("nd%s%s" % (obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).data)
+    elif hasattr(obj, 'columns'):                       # Dataframe
+        h.update(b"df")
+        for col in obj.columns:
+            _Plot_Hash(h, col)
+            _Plot_Hash(h, obj[col].to_numpy())
+    elif hasattr(obj, 'to_numpy'):                      # Series
+        _Plot_Hash(h, obj.to_numpy())
+    elif isinstance(obj, collections.abc.Mapping):
+        h.update(b"map%d" % len(obj))
+        for k, v in obj.items():                        # In order: it sets the plotting order
+            _Plot_Hash(h, k)
+            _Plot_Hash(h, v)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"seq%d" % len(obj))
+        for v in obj:
+            _Plot_Hash(h, v)
+    else:
+        h.update(("%s:%r" % (type(obj).__name__, obj)).encode())
+
+@functools.lru_cache(maxsize=None)
+def _Plot_StyleHash(stylepath,size,mtime):
+    """
+    This FUNCTION hashes the contents of a style file (cached until the file changes).
+    """
+    with open(stylepath, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def Plot_CacheKey(name,arguments):
+    """
+    This FUNCTION builds the cache key of a plot call from the function name, every argument
+    (arrays by content) and the contents of the style file.
+
+    Input:
+        name        ->      [String]
+                            Name of the plotting function
+        
+        arguments   ->      [Dictionary]
+                            Argument name -> value of the call, including defaults
+    Output:
+        key         ->      [String]
+                            Hex digest of the call
+    """
+    h = hashlib.sha1(("%s|%d" % (name, PlotCacheVersion)).encode())
+    for arg, value in arguments.items():
+        h.update(arg.encode())
+        if arg == 'stylepath' and value is not None:
+            stat = os.stat(value)
+            value = _Plot_StyleHash(os.path.abspath(value), stat.st_size, stat.st_mtime_ns)
+        _Plot_Hash(h, value)
+    return h.hexdigest()
+
+#----------------------------------------------------
+
+class Plot_Cache:
+    """
+    This CLASS skips plot calls whose output already exists. Each plotting function called inside
+    the with block is keyed by a hash of its arguments (see Plot_CacheKey). When an earlier call
+    with the same key saved outputs that are still on disk and unchanged, the call returns at once
+    without rendering. The manifest lists every key with the files it produced, and clean() deletes
+    the outputs of keys not used since the cache was opened (e.g. samples dropped from a report).
+
+    Input:
+        manifestpath    ->  [String]
+                            JSON file recording the cached calls (created if missing)
+    
+    Use as:
+        with Plot_Cache(os.path.join(savepath, "plotcache.json")) as cache:
+            RvT_raw_plot(time, resist, ch, samplename, savepath)
+            ...
+            cache.clean()       # Remove plots this run no longer produces
+    
+    Calls rendered in Plot_Batch worker processes are not cached.
+    """
+    
+    def __init__(self,manifestpath):
+        self.manifestpath = manifestpath
+        self.entries = {}
+        if os.path.exists(manifestpath):
+            with open(manifestpath) as f:
+                self.entries = json.load(f)['entries']
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+    
+    def hit(self,key):
+        """
+        Returns True (and marks the key as used) if every output of an earlier call with this key
+        still exists with the size and modification time it was recorded with.
+        """
+        entry = self.entries.get(key)
+        if entry is None or not entry['outputs']:
+            self.misses += 1
+            return False
+        for output in entry['outputs']:
+            path = output['path']
+            if not os.path.exists(path):
+                self.misses += 1
+                return False
+            stat = os.stat(path)
+            if output['size'] is not None and (stat.st_size, stat.st_mtime_ns) != (output['size'], output['mtime']):
+                self.misses += 1
+                return False
+        self.used.add(key)
+        self.hits += 1
+        return True
+    
+    def store(self,key,name,outputs):
+        """
+        Records the outputs saved by a rendered call. Older keys that saved to the same files are
+        dropped, since their outputs were overwritten.
+        """
+        paths = set(os.path.abspath(p) for p in outputs)
+        for other in [k for k, e in self.entries.items() if any(o['path'] in paths for o in e['outputs'])]:
+            del self.entries[other]
+            self.used.discard(other)
+        self.entries[key] = {'func': name,
+                             'time': _time.strftime("%Y-%m-%dT%H:%M:%S"),
+                             'outputs': [{'path': p, 'size': None, 'mtime': None} for p in sorted(paths)]}
+        self.used.add(key)
+    
+    def save(self):
+        """
+        Writes the manifest, recording the size and modification time of outputs written since the
+        last save (call after any Plot_Writer has been flushed).
+        """
+        for entry in self.entries.values():
+            for output in entry['outputs']:
+                if output['size'] is None and os.path.exists(output['path']):
+                    stat = os.stat(output['path'])
+                    output['size'], output['mtime'] = stat.st_size, stat.st_mtime_ns
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifestpath)), exist_ok=True)
+        from DataExtracter import File_Atomic      # Imported here so plotting alone never loads pandas
+        with File_Atomic(self.manifestpath) as tmppath, open(tmppath, 'w') as f:
+            json.dump({'version': PlotCacheVersion, 'entries': self.entries}, f, indent=1, sort_keys=True)
+    
+    def clean(self,dryrun=False):
+        """
+        Deletes the outputs of every key not used since the cache was opened and drops those keys
+        from the manifest. Files also produced by a used key are kept.
+
+        Input:
+            dryrun      ->  [Bool]
+                            Only list the files that would be deleted
+        Output:
+            removed     ->  [List]
+                            File paths deleted (or that would be deleted)
+        """
+        keep = set(o['path'] for k in self.used for o in self.entries[k]['outputs'])
+        removed = []
+        for key in [k for k in self.entries if k not in self.used]:
+            for output in self.entries[key]['outputs']:
+                if output['path'] not in keep and os.path.exists(output['path']):
+                    removed.append(output['path'])
+                    if not dryrun:
+                        os.remove(output['path'])
+            if not dryrun:
+                del self.entries[key]
+        return removed
+    
+    def __enter__(self):
+        _Plot_Caches.append(self)
+        return self
+    
+    def __exit__(self,*exc):
+        _Plot_Caches.remove(self)
+        for sink in _Plot_Sinks:
+            sink.queue.join()   # Outputs must be on disk to record their size and time
+        self.save()
+
+#----------------------------------------------------
+
+#====================================================
+# Figure Templates
+#====================================================
+
+class Plot_Template:
+    """
+    This CLASS builds the styled figure of one plot kind once and reuses it for every sample: each
+    render() only swaps the line data, recomputes the axis limits, and saves. The output matches
+    RvT_raw_plot, RvFvT_raw_plot, FvD_plot and DvT_plot without rebuilding the axes each time.
+
+    Input:
+        kind        ->      [String]
+                            Plot kind, one of
+                                'RvT'   -> render(time, resist, samplename, savepath)                       (as RvT_raw_plot)
+                                'RvFvT' -> render(rtime, rdata, ftime, fdata, samplename, savepath)         (as RvFvT_raw_plot)
+                                'FvD'   -> render(disp, force, samplename, savepath)                        (as FvD_plot)
+                                'DvT'   -> render(time, disp, samplename, savepath)                         (as DvT_plot)
+        
+        stylepath   ->      [String]
+                            File path of the .mplstyle file (None = keep current style)
+        
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
+    
+    Use as:
+        with Plot_Template('RvT') as tpl:
+            for s in samples:
+                tpl.render(time[s], resist[s], names[s], savepath)
+    """
+    
+    def __init__(self,kind,stylepath=BaseStylePath,decimate=None):
+        self.kind = kind
+        self.stylepath = stylepath
+        self.decimate = decimate
+        with Plot_Style(stylepath):
+            getattr(self, '_build_' + kind)()
+    
+    def _build_RvT(self):
+        self.fig, self.ax = plt.subplots()
+        self.line, = self.ax.plot([], [],
+                                  color = 'r', 
+                                  markerfacecolor = 'red',
+                                  markeredgecolor = 'red')
+        self.ax.set_xlabel("Time [$s$]")
+        self.ax.set_ylabel("Resistance [$\Omega$]")
+        self.subdir, self.suffix = "RvT", "_RvT_raw_plot.png"
+    
+    def _build_RvFvT(self):
+        self.fig, self.ax = plt.subplots(layout='constrained')
+        self.ax2 = self.ax.twinx()
+        self.line2, = self.ax2.plot([], [],
+                                    color = 'k',
+                                    ls = '--', 
+                                    markerfacecolor = 'k',
+                                    markeredgecolor = 'k',
+                                    label = 'Force',
+                                    zorder = 10)
+        self.line, = self.ax.plot([], [],
+                                  color = 'r',
+                                  ls = '-',
+                                  markerfacecolor = 'r',
+                                  markeredgecolor = 'r',
+                                  label = 'Resistance',
+                                  zorder = 1)
+        self.ax.set_xlabel("Time [$s$]")
+        self.ax.set_ylabel("Resistance [$\Omega$]")
+        self.ax.set_ymargin(0.2)
+        self.ax2.set_ylabel("Applied Force [N]")
+        self.fig.legend(bbox_to_anchor=(0.05, 1.02, 1, 0.2), 
+                        loc="lower left",  
+                        borderaxespad=0, 
+                        ncol=7)
+        self.ax.set_zorder(self.ax2.get_zorder()+1)
+        self.ax.set_frame_on(False)
+        self.subdir, self.suffix = "RvFvT", "_RvFvT_plot.png"
+    
+    def _build_FvD(self):
+        self.fig, self.ax = plt.subplots(layout='constrained')
+        self.ax.set_xlabel("Displacement [$mm$]")
+        self.ax.set_ylabel("Force [$N$]")
+        self.ax.set_ymargin(0.2)
+        self.line, = self.ax.plot([], [],
+                                  color = 'k',
+                                  ls = '--', 
+                                  markerfacecolor = 'k',
+                                  markeredgecolor = 'k',
+                                  label = "Force")
+        self.subdir, self.suffix = "FvD", "_FvD_plot.png"
+    
+    def _build_DvT(self):
+        self.fig, self.ax = plt.subplots(layout='constrained')
+        self.ax.set_ylabel("Displacement [$mm$]") 
+        self.ax.set_xlabel("Time [$s$]") 
+        self.ax.set_ymargin(0.2)
+        self.line, = self.ax.plot([], [],
+                                  color = 'b',
+                                  ls = '-', 
+                                  markerfacecolor = 'b',
+                                  markeredgecolor = 'b',
+                                  label = "Displacement")
+        self.subdir, self.suffix = "DvT", "_DvT_plot.png"
+    
+    def render(self,*args):
+        """
+        Swaps in one sample's data, rescales the axes and saves the figure (see class docstring
+        for the arguments of each kind).
+        """
+        with Plot_Style(self.stylepath):
+            self._render(*args)
+    
+    def _render(self,*args):
+        *data, samplename, savepath = args
+        
+        if self.kind == 'RvFvT':
+            rtime, rdata, ftime, fdata = data
+            self.line.set_data(*Plot_Decimate(np.subtract(rtime, rtime[0]), rdata, self.decimate))    # Synching time starts
+            self.line2.set_data(*Plot_Decimate(ftime, fdata, self.decimate))
+            for ax in (self.ax, self.ax2):
+                ax.set_autoscale_on(True)
+                ax.relim()
+                ax.autoscale_view()
+            self.ax2.set_ylim(ymin = -10, ymax = 260)                                   # Force axis limits
+        else:
+            self.line.set_data(*Plot_Decimate(*data, n_points=self.decimate))
+            self.ax.set_autoscale_on(True)
+            self.ax.relim()
+            self.ax.autoscale_view()
+            if self.kind == 'RvT':
+                self.ax.set_ylim(bottom=0)
+        
+        Plot_Save(self.fig, Plot_Path(savepath, self.subdir, samplename + self.suffix))
+    
+    def close(self):
+        plt.close(self.fig)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self,*exc):
+        self.close()
+
+#----------------------------------------------------
 
 #====================================================
 # Resistance vs Time Graphs
 #====================================================
 
-def RvT_raw_plot(time,resist,ch,samplename,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def RvT_raw_plot(time,resist,ch,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes raw time and resistance data and plots them
 
@@ -34,11 +943,12 @@ def RvT_raw_plot(time,resist,ch,samplename,savepath,stylepath=BaseStylePath):
                             
         savepath    ->      [String]
                             file path to directory for this to be saved under
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resistance over time.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)   
 
     """    
     # Set Resistance Limits based on channel defaults
@@ -50,7 +960,7 @@ def RvT_raw_plot(time,resist,ch,samplename,savepath,stylepath=BaseStylePath):
     
     # Plot Creation
     fig, ax = plt.subplots()
-    plot = plt.plot(time, resist,
+    plot = plt.plot(*Plot_Decimate(time,resist,n_points=decimate),
                     color = 'r', 
                     markerfacecolor = 'red',
                     markeredgecolor = 'red')
@@ -61,12 +971,13 @@ def RvT_raw_plot(time,resist,ch,samplename,savepath,stylepath=BaseStylePath):
     #plt.rcParams.update({'figure.dpi': '100'})     # Use with plt.show() to avoid weird aspect ratio
     #plt.show()  
     
-    plt.savefig(savepath + "\\Plots\\RvT\\" +  samplename + "_RvT_raw_plot.png", bbox_inches='tight', pad_inches=0.1)
+    Plot_Save(plt.gcf(), Plot_Path(savepath, "RvT", samplename + "_RvT_raw_plot.png"))
     plt.close()
 
 #----------------------------------------------------
 
-def RvT_delta_plot(time,resist,samplename,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def RvT_delta_plot(time,resist,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes delta time and delta resistance data and plots them
 
@@ -79,15 +990,16 @@ def RvT_delta_plot(time,resist,samplename,savepath,stylepath=BaseStylePath):
 
         name        ->      [String]
                             Name that the plot will be saved under
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resistance over time.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)
   
     
     fig, ax = plt.subplots()
-    plot = plt.plot(time, resist,
+    plot = plt.plot(*Plot_Decimate(time,resist,n_points=decimate),
                     color = 'r', 
                     markerfacecolor = 'red',
                     markeredgecolor = 'red')
@@ -99,12 +1011,13 @@ def RvT_delta_plot(time,resist,samplename,savepath,stylepath=BaseStylePath):
     #plt.rcParams.update({'figure.dpi': '100'})     # Use with plt.show() to avoid weird aspect ratio
     #plt.show()  
     
-    plt.savefig(savepath + "\\Plots\\RvT\\" +  samplename + "_RvT_delta_plot.png", bbox_inches='tight', pad_inches=0.1)
+    Plot_Save(plt.gcf(), Plot_Path(savepath, "RvT", samplename + "_RvT_delta_plot.png"))
     plt.close()
 
 #----------------------------------------------------
 
-def RvT_tfil_plot(time,resist,samplename,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def RvT_tfil_plot(time,resist,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes time filteredtime and resistance data and plots them
 
@@ -117,14 +1030,15 @@ def RvT_tfil_plot(time,resist,samplename,savepath,stylepath=BaseStylePath):
 
         name        ->      [String]
                             Name that the plot will be saved under
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resistance over time.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)
     
     fig, ax = plt.subplots()
-    plot = plt.plot(time, resist,
+    plot = plt.plot(*Plot_Decimate(time,resist,n_points=decimate),
                     color = 'r', 
                     markerfacecolor = 'red',
                     markeredgecolor = 'red')
@@ -135,12 +1049,13 @@ def RvT_tfil_plot(time,resist,samplename,savepath,stylepath=BaseStylePath):
     #plt.rcParams.update({'figure.dpi': '100'})     # Use with plt.show() to avoid weird aspect ratio
     #plt.show()  
     
-    plt.savefig(savepath + "\\Plots\\RvT\\" +  samplename + "_RvT_tfil_plot.png", bbox_inches='tight', pad_inches=0.1)
+    Plot_Save(plt.gcf(), Plot_Path(savepath, "RvT", samplename + "_RvT_tfil_plot.png"))
     plt.close()
 
 #----------------------------------------------------
 
-def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes raw time and resistance data and plots them
 
@@ -157,11 +1072,12 @@ def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath):
                             
         savepath            ->      [String]
                                     file path to directory for this to be saved under
+
+        decimate            ->      [Int]
+                                    Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resistance over time.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)
     
     n_c = len(data_in)
     N = 5
@@ -202,7 +1118,7 @@ def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath):
         time_start  = data_in[0][0,0]
         time[0]     = np.subtract(data_in[0][:,0],time_start)
         resist[0]   = data_in[0][:,ch]
-        plt.plot(time[0], resist[0],label = name,ls='-')
+        plt.plot(*Plot_Decimate(time[0],resist[0],n_points=decimate),label = name,ls='-')
         
         # Plot in between cycles
         for n in cycles:
@@ -211,14 +1127,14 @@ def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath):
             time_start  = data_in[c][0,0]
             time[n]     = np.subtract(data_in[c][:,0],time_start)
             resist[n]   = data_in[c][:,ch]
-            plt.plot(time[n], resist[n],label = name,ls='-')
+            plt.plot(*Plot_Decimate(time[n],resist[n],n_points=decimate),label = name,ls='-')
             
         # Plot last cycle
         name        = samplename + "-C" + str(n_c)
         time_start  = data_in[n_c-1][0,0]
         time[mul+1]     = np.subtract(data_in[n_c-1][:,0],time_start)
         resist[mul+1]   = data_in[n_c-1][:,ch]
-        plt.plot(time[mul+1], resist[mul+1],label = name,ls='-')
+        plt.plot(*Plot_Decimate(time[mul+1],resist[mul+1],n_points=decimate),label = name,ls='-')
     
             
         plt.xlabel("Time [$s$]")
@@ -229,7 +1145,7 @@ def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath):
         plt.legend(bbox_to_anchor=(0, 1.02, 1, 0.2), loc="lower left",
                     borderaxespad=0, ncol=5)
 
-        plt.savefig(savepath + "\\Plots\\RvT\\" +  samplename + "_RvT_cycle_plot.png", bbox_inches='tight', pad_inches=0.1)
+        Plot_Save(plt.gcf(), Plot_Path(savepath, "RvT", samplename + "_RvT_cycle_plot.png"))
         plt.close()
         
   
@@ -241,7 +1157,7 @@ def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath):
             time[c] = np.subtract(data_in[c][:,0],time_start)
             resist[c] = data_in[c][:,ch]
 
-            plt.plot(time[c], resist[c], label=name, ls='-')
+            plt.plot(*Plot_Decimate(time[c],resist[c],n_points=decimate), label=name, ls='-')
             
         plt.xlabel("Time [$s$]")
         plt.ylabel("Resistance [$\Omega$]")
@@ -251,12 +1167,13 @@ def RvT_cycle_plot(data_in,ch,samplename,savepath,stylepath=BaseStylePath):
         plt.legend(bbox_to_anchor=(0, 1.02, 1, 0.2), loc="lower left",
                     borderaxespad=0, ncol=5)
             
-        plt.savefig(savepath + "\\Plots\\RvT\\" +  samplename + "_RvT_cycle_plot.png", bbox_inches='tight', pad_inches=0.1)
+        Plot_Save(plt.gcf(), Plot_Path(savepath, "RvT", samplename + "_RvT_cycle_plot.png"))
         plt.close()        
 
 #----------------------------------------------------
     
-def RvT_comb_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def RvT_comb_plot(data_in,testparam,savepath,stylepath=BaseStylePath,progressive=False,decimate=None):
     """
     This FUNCTION takes multiple time and resistance data and plots them
 
@@ -280,11 +1197,16 @@ def RvT_comb_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
         
         savepath        ->      [String]
                                     File path to directory for this to be saved under
+        
+        progressive     ->      [Bool]
+                                    If true, draw each sample's line once and save the cumulative
+                                    snapshots through Plot_Progressive (axis layout fixed from the last one)
+
+        decimate        ->      [Int]
+                                    Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resistance over time of all samples.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)
     
     # Sizes
     n_s = len(data_in)
@@ -292,6 +1214,11 @@ def RvT_comb_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
     # Test Duration
     TDur = round(float(testparam[0][2] * testparam[0][3]))
     
+    # Legend format
+    legend_kw = dict(bbox_to_anchor=(0, 1.02, 1, 0.2), loc="lower left",
+                     borderaxespad=0, ncol=7)
+    lines, steps = [], []   # Progressive mode: snapshots saved after the loop
+    
     for s in range(0,n_s): # Loops through samples
         samplename = "S" + str(s+1) + "_"
         ch = testparam[s][0]
@@ -302,24 +1229,32 @@ def RvT_comb_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
         time_start = data_in[s][0,0]
         time = np.subtract(data_in[s][:,0],time_start)
         resistance = data_in[s][:,ch]
-        plt.plot(time,resistance, ls = "-", label="S"+str(s+1))
-        
+        line, = plt.plot(*Plot_Decimate(time,resistance,n_points=decimate), ls = "-", label="S"+str(s+1))
+        lines.append(line)
 
         # Format Legend
-        plt.legend(bbox_to_anchor=(0, 1.02, 1, 0.2), loc="lower left",
-                    borderaxespad=0, ncol=7)
+        if not progressive:
+            plt.legend(**legend_kw)
         
         # Format Axis
         plt.xlabel("Time [$s$]")
         plt.ylabel("Resistance [$\Omega$]")
         plt.ylim(bottom = -10, top = ylim)
         plt.xlim(left = -10, right = TDur)
-        plt.savefig(savepath + "\\Plots\\RvT\\" + samplename + "RvT_comb_plot.png", bbox_inches='tight', pad_inches=0.1)
+        path = Plot_Path(savepath, "RvT", samplename + "RvT_comb_plot.png")
+        if progressive:
+            steps.append(([line], Plot_LegendOverlay(plt.gca(), lines, **legend_kw), path))
+        else:
+            Plot_Save(plt.gcf(), path)
+    
+    if progressive:
+        Plot_Progressive(plt.gcf(), steps, pad_inches=0.1)
     plt.close()
     
 #----------------------------------------------------
     
-def RvT_combdelta_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def RvT_combdelta_plot(data_in,testparam,savepath,stylepath=BaseStylePath,progressive=False,decimate=None):
     """
     This FUNCTION takes multiple time and resistance data and plots them
 
@@ -343,11 +1278,16 @@ def RvT_combdelta_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
         
         savepath        ->      [String]
                                     File path to directory for this to be saved under
+        
+        progressive     ->      [Bool]
+                                    If true, draw each sample's line once and save the cumulative
+                                    snapshots through Plot_Progressive (axis layout fixed from the last one)
+
+        decimate        ->      [Int]
+                                    Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resistance over time of all samples.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)
     
     # Sizes
     n_s = len(data_in)
@@ -355,6 +1295,11 @@ def RvT_combdelta_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
     # Test Duration
     TDur = round(float(testparam[0][2] * testparam[0][3]))
     
+    # Legend format
+    legend_kw = dict(bbox_to_anchor=(0, 1.02, 1, 0.2), loc="lower left",
+                     borderaxespad=0, ncol=7)
+    lines, steps = [], []   # Progressive mode: snapshots saved after the loop
+    
     for s in range(0,n_s): # Loops through samples
         samplename = "S" + str(s+1) + "_"
         ch = testparam[s][0]   
@@ -362,24 +1307,32 @@ def RvT_combdelta_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
         res_start = data_in[s][0,ch]
         time = np.subtract(data_in[s][:,0],time_start)
         resistance = np.subtract(data_in[s][:,ch],res_start)
-        plt.plot(time,resistance, ls = "-", label="S"+str(s+1))
-        
+        line, = plt.plot(*Plot_Decimate(time,resistance,n_points=decimate), ls = "-", label="S"+str(s+1))
+        lines.append(line)
 
         # Format Legend
-        plt.legend(bbox_to_anchor=(0, 1.02, 1, 0.2), loc="lower left",
-                    borderaxespad=0, ncol=7)
+        if not progressive:
+            plt.legend(**legend_kw)
         
         # Format Axis
         plt.xlabel("Time [$s$]")
         plt.ylabel("Resistance Change [$\Delta\Omega$]")
         plt.ylim(bottom = 0, top = 20)
         plt.xlim(left = -10, right = TDur)
-        plt.savefig(savepath + "\\Plots\\RvT\\" + samplename + "RvT_combdelta_plot.png", bbox_inches='tight', pad_inches=0.1)
+        path = Plot_Path(savepath, "RvT", samplename + "RvT_combdelta_plot.png")
+        if progressive:
+            steps.append(([line], Plot_LegendOverlay(plt.gca(), lines, **legend_kw), path))
+        else:
+            Plot_Save(plt.gcf(), path)
+    
+    if progressive:
+        Plot_Progressive(plt.gcf(), steps, pad_inches=0.1)
     plt.close()
     
 #----------------------------------------------------
     
-def RvT_combraw_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def RvT_combraw_plot(data_in,testparam,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes multiple time and resistance data and plots them
 
@@ -403,11 +1356,12 @@ def RvT_combraw_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
         
         savepath        ->      [String]
                                     File path to directory for this to be saved under
+
+        decimate        ->      [Int]
+                                    Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resistance over time of all samples.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)
     
     n_s = len(data_in)
     
@@ -418,7 +1372,7 @@ def RvT_combraw_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
         #time = np.subtract(data_in[s][:,0],time_start)
         time = data_in[s][:,0]
         resistance = data_in[s][:,ch]
-        plt.plot(time,resistance, ls = "-", label="S"+str(s+1))
+        plt.plot(*Plot_Decimate(time,resistance,n_points=decimate), ls = "-", label="S"+str(s+1))
         
 
     # Format Legend
@@ -430,7 +1384,7 @@ def RvT_combraw_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
     plt.ylabel("Resistance [$\Omega$]")
     #plt.ylim(bottom = 300, top = 600)
     plt.xlim(left = -10)
-    plt.savefig(savepath + "\\Plots\\RvT\\" + "RvT_combraw_plot.png", bbox_inches='tight', pad_inches=0.1)
+    Plot_Save(plt.gcf(), Plot_Path(savepath, "RvT", "RvT_combraw_plot.png"))
     plt.close()
 
     
@@ -440,7 +1394,8 @@ def RvT_combraw_plot(data_in,testparam,savepath,stylepath=BaseStylePath):
 
 #----------------------------------------------------
 
-def RvFvT_raw_plot(rtime,rdata,ftime,fdata,samplename,savepath):
+@_Plot_Styled
+def RvFvT_raw_plot(rtime,rdata,ftime,fdata,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes raw resistance and force data and plots them against time.
 
@@ -461,6 +1416,9 @@ def RvFvT_raw_plot(rtime,rdata,ftime,fdata,samplename,savepath):
                             Name that the plot will be saved under
         savepath    ->      [String]
                             File path to directory for this to be saved under                            
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     OUTPUT:
         Saves a png plot showing resisitance over time and force over time.
     """
@@ -474,7 +1432,7 @@ def RvFvT_raw_plot(rtime,rdata,ftime,fdata,samplename,savepath):
     delta_rtime = np.subtract(rtime,rtime_start)
 
     # Plot Generation
-    ax2.plot(ftime,fdata,                       # Create force vs time plot
+    ax2.plot(*Plot_Decimate(ftime,fdata,n_points=decimate),           # Create force vs time plot
                 color = 'k',
                 ls = '--', 
                 markerfacecolor = 'k',
@@ -482,7 +1440,7 @@ def RvFvT_raw_plot(rtime,rdata,ftime,fdata,samplename,savepath):
                 label = 'Force',
                 zorder = 10)
 
-    ax1.plot(delta_rtime, rdata,                # Create resistance vs time plot     
+    ax1.plot(*Plot_Decimate(delta_rtime,rdata,n_points=decimate),     # Create resistance vs time plot     
                 color = 'r',
                 ls = '-',
                 markerfacecolor = 'r',
@@ -507,12 +1465,13 @@ def RvFvT_raw_plot(rtime,rdata,ftime,fdata,samplename,savepath):
     ax1.set_zorder(ax2.get_zorder()+1)
     ax1.set_frame_on(False)
     
-    plt.savefig(savepath + "\\Plots\\RvFvT\\" + samplename + "_RvFvT_plot.png", bbox_inches='tight', pad_inches=0.1)
+    Plot_Save(plt.gcf(), Plot_Path(savepath, "RvFvT", samplename + "_RvFvT_plot.png"))
     plt.close()
 
 #----------------------------------------------------
 
-def RvFvT_delta_plot(rtime,rdata,ftime,fdata,samplename,savepath):
+@_Plot_Styled
+def RvFvT_delta_plot(rtime,rdata,ftime,fdata,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes delta resistance and force data and plots them against time.
 
@@ -531,6 +1490,9 @@ def RvFvT_delta_plot(rtime,rdata,ftime,fdata,samplename,savepath):
 
         samplename  ->      [String]
                             Name that the plot will be saved under
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resisitance over time and force over time.
     """
@@ -544,7 +1506,7 @@ def RvFvT_delta_plot(rtime,rdata,ftime,fdata,samplename,savepath):
     delta_rtime = np.subtract(rtime,rtime_start)
 
     # Plot Generation
-    ax2.plot(ftime,fdata,                       # Create force vs time plot
+    ax2.plot(*Plot_Decimate(ftime,fdata,n_points=decimate),           # Create force vs time plot
                 color = 'k',
                 ls = '--', 
                 markerfacecolor = 'k',
@@ -552,7 +1514,7 @@ def RvFvT_delta_plot(rtime,rdata,ftime,fdata,samplename,savepath):
                 label = 'Force',
                 zorder = 10)
 
-    ax1.plot(delta_rtime, rdata,                # Create resistance vs time plot     
+    ax1.plot(*Plot_Decimate(delta_rtime,rdata,n_points=decimate),     # Create resistance vs time plot     
                 color = 'r',
                 ls = '-',
                 markerfacecolor = 'r',
@@ -575,12 +1537,13 @@ def RvFvT_delta_plot(rtime,rdata,ftime,fdata,samplename,savepath):
     ax1.set_zorder(ax2.get_zorder()+1)
     ax1.set_frame_on(False)
     
-    plt.savefig(savepath + "\\Plots\\RvFvT\\" + samplename + "_RvFvT_plot.png", bbox_inches='tight', pad_inches=0.1)
+    Plot_Save(plt.gcf(), Plot_Path(savepath, "RvFvT", samplename + "_RvFvT_plot.png"))
     plt.close()
 
 #----------------------------------------------------
 
-def RvFvT_comb_plot(rdata,ftime,fdata,testparam,savepath):
+@_Plot_Styled
+def RvFvT_comb_plot(rdata,ftime,fdata,testparam,savepath,stylepath=BaseStylePath,progressive=False,decimate=None):
     """
     This FUNCTION takes raw resistance and force data and plots them against time.
 
@@ -610,7 +1573,13 @@ def RvFvT_comb_plot(rdata,ftime,fdata,testparam,savepath):
                             
         savepath    ->      [String]
                             File path to directory for this to be saved under    
-                            
+        
+        progressive ->      [Bool]
+                            If true, draw each sample's line once and save the cumulative snapshots
+                            through Plot_Progressive (axis limits and layout fixed from the final plot)
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     OUTPUT:
         Saves a png plot showing resisitance over time and force over time.
     """
@@ -636,7 +1605,7 @@ def RvFvT_comb_plot(rdata,ftime,fdata,testparam,savepath):
     ax1.set_frame_on(False)    
     
     # Force Plot
-    ax2.plot(ftime,fdata,                       
+    ax2.plot(*Plot_Decimate(ftime,fdata,n_points=decimate),                       
                     color = 'k',
                     ls = '--', 
                     markerfacecolor = 'k',
@@ -649,6 +1618,12 @@ def RvFvT_comb_plot(rdata,ftime,fdata,testparam,savepath):
                 ncol=7)
     
     # Resistance Plots
+    legend_kw = dict(bbox_to_anchor=(0.1, 1.02, 1, 0.2),
+                     loc="lower left", 
+                     borderaxespad=0,
+                     ncol=7)
+    lines, steps = [], []   # Progressive mode: snapshots saved after the loop
+    at = None               # Progressive mode: latest excluded samples text box
     for s in range(0,n_s): # Loops through samples
         include = testparam[s][4]
         if include == True:
@@ -662,29 +1637,37 @@ def RvFvT_comb_plot(rdata,ftime,fdata,testparam,savepath):
             resistance = rdata[s][:,ch]
             
             # Resistance plots        
-            ax1.plot(time,resistance,
+            line, = ax1.plot(*Plot_Decimate(time,resistance,n_points=decimate),
                     ls = "-",
                     label="S"+str(s+1))
+            lines.append(line)
             
-            # Legend        
-            ax1.legend(bbox_to_anchor=(0.1, 1.02, 1, 0.2),
-                    loc="lower left", 
-                    borderaxespad=0,
-                    ncol=7) 
-            plt.savefig(savepath + "\\Plots\\RvFvT\\" + samplename + "RvFvT_comb_plot.png", bbox_inches='tight', pad_inches=0.1)
+            path = Plot_Path(savepath, "RvFvT", samplename + "RvFvT_comb_plot.png")
+            if progressive:
+                steps.append(([line], Plot_LegendOverlay(ax1, lines, [at] if at is not None else [], **legend_kw), path))
+            else:
+                # Legend        
+                ax1.legend(**legend_kw) 
+                Plot_Save(plt.gcf(), path)
         
         elif include == False:   
             at_txt += "\nSample " + str(s+1) + " - " + testparam[s][5]  # Adds line of text per excluded sample with reason 
             
         # Excluded Samples Text Box
-        at = AnchoredText(at_txt,
+        at = offsetbox.AnchoredText(at_txt,
                           frameon = True , 
                           loc = 'lower right',
                           borderpad=0.75)
         at.patch.set_boxstyle("round,pad=0.,rounding_size=0.3")
-        ax1.add_artist(at)       
-        
-    fig.savefig(savepath + "\\Plots\\RvFvT\\" + "Fin_RvFvT_comb_plot.png", bbox_inches='tight', pad_inches=0.1)      
+        if not progressive:
+            ax1.add_artist(at)       
+    
+    path = Plot_Path(savepath, "RvFvT", "Fin_RvFvT_comb_plot.png")
+    if progressive:
+        steps.append(([], Plot_LegendOverlay(ax1, lines, [at] if at is not None else [], **legend_kw), path))
+        Plot_Progressive(fig, steps, pad_inches=0.1)
+    else:
+        Plot_Save(fig, path)      
         
     plt.close() 
     
@@ -694,7 +1677,8 @@ def RvFvT_comb_plot(rdata,ftime,fdata,testparam,savepath):
 # Resistance vs Force Plots
 #====================================================
 
-def RvF_plot(force,resist,samplename,savepath):
+@_Plot_Styled
+def RvF_plot(force,resist,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes force and resistance data and plots them
 
@@ -707,13 +1691,16 @@ def RvF_plot(force,resist,samplename,savepath):
 
         samplename  ->      [String]
                             Name that the plot will be saved under
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     Output:
         Saves a png plot showing resisitance over force.
     """
     
     
     fig, ax = plt.subplots()
-    plot = plt.plot(force, resist, 
+    plot = plt.plot(*Plot_Decimate(force,resist,n_points=decimate), 
                     color = 'b',
                     markerfacecolor = 'b',
                     markeredgecolor = 'b')
@@ -724,14 +1711,15 @@ def RvF_plot(force,resist,samplename,savepath):
     #plt.rcParams.update({'figure.dpi': '100'})     # Use with plt.show() to avoid weird aspect ratio
     #plt.show()  
     
-    plt.savefig(savepath + "\\Plots\\RvF\\" + samplename + "_RvF_plot.png", bbox_inches='tight', pad_inches=0.1)
+    Plot_Save(plt.gcf(), Plot_Path(savepath, "RvF", samplename + "_RvF_plot.png"))
     plt.close()
     
 #====================================================
 # Force vs Displacement Plots
 #====================================================
 
-def FvD_plot(disp,force,samplename,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def FvD_plot(disp,force,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes raw resistance and force data and plots them against time.
 
@@ -746,11 +1734,12 @@ def FvD_plot(disp,force,samplename,savepath,stylepath=BaseStylePath):
                             Name that the plot will be saved under
         savepath    ->      [String]
                             File path to directory for this to be saved under                            
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     OUTPUT:
         Saves a png plot showing resisitance over time and force over time.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)
     
     # Setup figures
     fig, ax = plt.subplots(layout='constrained')   # Initiate figure and first axis (plot)
@@ -761,20 +1750,21 @@ def FvD_plot(disp,force,samplename,savepath,stylepath=BaseStylePath):
     ax.set_ymargin(0.2)                                         # Force axis margins (gives padding around edges based on multiplier)
         
     # Force Plot
-    ax.plot(disp,force,                       
+    ax.plot(*Plot_Decimate(disp,force,n_points=decimate),                       
                     color = 'k',
                     ls = '--', 
                     markerfacecolor = 'k',
                     markeredgecolor = 'k',
                     label = "Force")
         
-    fig.savefig(savepath + "\\Plots\\FvD\\" + samplename + "_FvD_plot.png", bbox_inches='tight', pad_inches=0.1)      
+    Plot_Save(fig, Plot_Path(savepath, "FvD", samplename + "_FvD_plot.png"))      
     
     plt.close() 
   
 #----------------------------------------------------
 
-def FvD_comb_plot(data,testparam,savepath):
+@_Plot_Styled
+def FvD_comb_plot(data,testparam,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes raw resistance and force data and plots them against time.
 
@@ -789,6 +1779,9 @@ def FvD_comb_plot(data,testparam,savepath):
                             Name that the plot will be saved under
         savepath    ->      [String]
                             File path to directory for this to be saved under                            
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     OUTPUT:
         Saves a png plot showing resisitance over time and force over time.
     """
@@ -811,7 +1804,7 @@ def FvD_comb_plot(data,testparam,savepath):
     ax1.set_frame_on(False)    
     
     # Force Plot
-    ax2.plot(ftime,fdata,                       
+    ax2.plot(*Plot_Decimate(ftime,fdata,n_points=decimate),                       
                     color = 'k',
                     ls = '--', 
                     markerfacecolor = 'k',
@@ -830,7 +1823,7 @@ def FvD_comb_plot(data,testparam,savepath):
         resistance = rdata[s][:,ch]
         
         # Resistance plots        
-        ax1.plot(time,resistance,
+        ax1.plot(*Plot_Decimate(time,resistance,n_points=decimate),
                  ls = "-",
                  label="S"+str(s+1))
         
@@ -841,7 +1834,7 @@ def FvD_comb_plot(data,testparam,savepath):
                 borderaxespad=0,
                 ncol=7)   
         
-    fig.savefig(savepath + "\\Plots\\FvD\\" + "FvD_comb_plot.png", bbox_inches='tight', pad_inches=0.1)      
+    Plot_Save(fig, Plot_Path(savepath, "FvD", "FvD_comb_plot.png"))      
    
     plt.close() 
   
@@ -851,7 +1844,8 @@ def FvD_comb_plot(data,testparam,savepath):
 # Displacement vs Time Plots
 #====================================================
 
-def DvT_plot(time,disp_in,samplename,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def DvT_plot(time,disp_in,samplename,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes raw resistance and force data and plots them against time.
 
@@ -866,11 +1860,12 @@ def DvT_plot(time,disp_in,samplename,savepath,stylepath=BaseStylePath):
                             Name that the plot will be saved under
         savepath    ->      [String]
                             File path to directory for this to be saved under                            
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     OUTPUT:
         Saves a png plot showing resisitance over time and force over time.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)    
     
     # Setup figures
     fig, ax = plt.subplots(layout='constrained')   # Initiate figure and first axis (plot)
@@ -881,14 +1876,14 @@ def DvT_plot(time,disp_in,samplename,savepath,stylepath=BaseStylePath):
     ax.set_ymargin(0.2)             
          
     # Force Plot
-    ax.plot(time,disp_in,                       
+    ax.plot(*Plot_Decimate(time,disp_in,n_points=decimate),                       
                     color = 'b',
                     ls = '-', 
                     markerfacecolor = 'b',
                     markeredgecolor = 'b',
                     label = "Displacement")
         
-    fig.savefig(savepath + "\\Plots\\DvT\\" + samplename + "_DvT_plot.png", bbox_inches='tight', pad_inches=0.1)      
+    Plot_Save(fig, Plot_Path(savepath, "DvT", samplename + "_DvT_plot.png"))      
     
     plt.close()     
 
@@ -899,7 +1894,8 @@ def DvT_plot(time,disp_in,samplename,savepath,stylepath=BaseStylePath):
 
 #----------------------------------------------------
 
-def FvDvT_comb_plot(data,savepath,stylepath=BaseStylePath):
+@_Plot_Styled
+def FvDvT_comb_plot(data,savepath,stylepath=BaseStylePath,decimate=None):
     """
     This FUNCTION takes raw resistance and force data and plots them against time.
 
@@ -914,11 +1910,12 @@ def FvDvT_comb_plot(data,savepath,stylepath=BaseStylePath):
                             Name that the plot will be saved under
         savepath    ->      [String]
                             File path to directory for this to be saved under                            
+
+        decimate    ->      [Int]
+                            Max points drawn per line (None = DecimatePoints, 0 = every point)
     OUTPUT:
         Saves a png plot showing resisitance over time and force over time.
     """
-    # Set plt style to custom template
-    plt.style.use(stylepath)    
     
     # Setup figures
     fig, ax1 = plt.subplots(layout='constrained')   # Initiate figure and first axis (plot)
@@ -946,13 +1943,13 @@ def FvDvT_comb_plot(data,savepath,stylepath=BaseStylePath):
         disp    = data[s]['Disp     ']
 
         # Displacement Plots
-        ax1.plot(time,disp,                       
+        ax1.plot(*Plot_Decimate(time,disp,n_points=decimate),                       
                     ls = '--', 
                     label = samplename)
     
     # Force Plot
     force   = data[s]['Load   ']
-    ax2.plot(time,force,
+    ax2.plot(*Plot_Decimate(time,force,n_points=decimate),
                 color = 'k',
                 markerfacecolor = 'k',
                 markeredgecolor = 'k',
@@ -967,7 +1964,7 @@ def FvDvT_comb_plot(data,savepath,stylepath=BaseStylePath):
                 borderaxespad=0,
                 ncol=8)   
         
-    fig.savefig(savepath + "\\Plots\\FvDvT\\" + "FvDvT_comb_plot.png", bbox_inches='tight', pad_inches=0.1)      
+    Plot_Save(fig, Plot_Path(savepath, "FvDvT", "FvDvT_comb_plot.png"))      
     
     plt.close() 
     
\ No newline at end of file
@@ -0,0 +1,343 @@
+#===============================================================================================
+# Profiling Functions
+#===============================================================================================
+
+# Opt-in per stage instrumentation for DataExtracter and PlotFxns. Every decorated function (a
+# "stage") records its wall time, rows processed, bytes of its input data file and, optionally, peak
+# allocated memory. Profiling is off by default: a stage then costs one flag check per call.
+#
+# Use as:
+#   with Profile_Session(memory=True):
+#       data = DataExtracter.Feather_DataExtract(path, 1)
+#       ...
+#   print(Profile_Report())                     # Table of totals per stage
+#   Profile_Report('json', "profile.json")      # Same report as JSON
+#
+# Only stages run in this process are recorded (not those in Campaign_Extract or Plot_Batch workers).
+
+# Imported Libraries
+import collections.abc
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_Profile_On = False             # Set by Profile_Enable / Profile_Disable
+_Profile_Memory = False         # Also trace peak allocated memory (slower)
+_Profile_Traced = False         # tracemalloc was started by Profile_Enable (so Profile_Disable stops it)
+_Profile_Records = []           # One dictionary per finished stage call
+_Profile_Lock = threading.Lock()
+_Profile_Local = threading.local()  # Per thread stack of running stages
+
+#===============================================================================================
+# Control Functions
+#===============================================================================================
+
+def Profile_Enable(memory=False):
+    """
+    This FUNCTION turns stage recording on.
+
+    INPUT:
+        memory (Bool)           ->      Also record the peak allocated memory of each stage using
+                                        tracemalloc (slows down allocation heavy code)
+    """
+    global _Profile_On, _Profile_Memory, _Profile_Traced
+    _Profile_Memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _Profile_Traced = True
+    _Profile_On = True
+
+def Profile_Disable():
+    """
+    This FUNCTION turns stage recording off (recorded stages are kept until Profile_Reset). Memory
+    tracing is only stopped if Profile_Enable started it.
+    """
+    global _Profile_On, _Profile_Memory, _Profile_Traced
+    _Profile_On = False
+    if _Profile_Traced and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _Profile_Traced = False
+    _Profile_Memory = False
+
+def Profile_Reset():
+    """
+    This FUNCTION deletes all recorded stages.
+    """
+    with _Profile_Lock:
+        del _Profile_Records[:]
+
+@contextlib.contextmanager
+def Profile_Session(memory=False,reset=True):
+    """
+    This FUNCTION is a context manager that records stages only inside its with block.
+
+    INPUT:
+        memory (Bool)           ->      Also record peak allocated memory (see Profile_Enable)
+        reset (Bool)            ->      Delete stages recorded before the block
+    """
+    if reset:
+        Profile_Reset()
+    Profile_Enable(memory)
+    try:
+        yield
+    finally:
+        Profile_Disable()
+
+#===============================================================================================
+# Stage Functions
+#===============================================================================================
+
+class _Profile_Null:
+    """
+    Stand-in returned by Profile_Stage while profiling is off.
+    """
+    def __enter__(self):
+        return {}
+
+    def __exit__(self,*exc):
+        return False
+
+_Profile_NullStage = _Profile_Null()
+
+def Profile_Stage(name,rows=None,nbytes=None):
+    """
+    This FUNCTION returns a context manager that records the block inside it as one stage. The
+    dictionary it yields can be updated inside the block (e.g. record['rows'] = len(data)).
+
+    INPUT:
+        name (String)           ->      Stage name in the report
+        rows (Int)              ->      Number of rows processed (None = unknown)
+        nbytes (Int)            ->      Number of bytes read (None = unknown)
+    """
+    if not _Profile_On:
+        return _Profile_NullStage
+    return _Profile_Run(name, rows, nbytes)
+
+@contextlib.contextmanager
+def _Profile_Run(name,rows,nbytes):
+    stack = getattr(_Profile_Local, 'stack', None)
+    if stack is None:
+        stack = _Profile_Local.stack = []
+
+    record = {'stage': name,
+              'parent': stack[-1]['stage'] if stack else None,
+              'rows': rows,
+              'bytes': nbytes,
+              'time': None,
+              'peak': None}
+    memory = _Profile_Memory and tracemalloc.is_tracing()
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]['_peak'] = max(stack[-1]['_peak'], peak)    # Keep the outer stage's peak before resetting it
+        tracemalloc.reset_peak()
+        record['_start'], record['_peak'] = current, current
+
+    stack.append(record)
+    t0 = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['time'] = time.perf_counter() - t0
+        stack.pop()
+        if memory:
+            peak = max(record.pop('_peak'), tracemalloc.get_traced_memory()[1])
+            record['peak'] = peak - record.pop('_start')
+            if stack:
+                stack[-1]['_peak'] = max(stack[-1]['_peak'], peak)
+        with _Profile_Lock:
+            _Profile_Records.append(record)
+
+#-----------------------------------------------------------------------------------------------
+
+def _Profile_Rows(obj):
+    """
+    This FUNCTION returns the number of rows in a stage's input or output: the first dimension of an
+    array or dataframe, summed over the values of a dictionary and taken from the first item of a tuple.
+    """
+    if obj is None or isinstance(obj, (str, bytes, os.PathLike)):
+        return None
+    if hasattr(obj, 'shape') and len(obj.shape) > 0:
+        return int(obj.shape[0])
+    if isinstance(obj, collections.abc.Mapping):
+        rows = [_Profile_Rows(v) for v in obj.values()]
+        rows = [r for r in rows if r is not None]
+        return sum(rows) if rows else None
+    if isinstance(obj, tuple) and len(obj) > 0:
+        return _Profile_Rows(obj[0])
+    return None
+
+def _Profile_Bytes(value):
+    """
+    This FUNCTION returns the size of a stage's data input when it is a file path.
+    """
+    if isinstance(value, (str, os.PathLike)) and os.path.isfile(value):
+        return os.path.getsize(value)
+    return None
+
+def _Profile_Input(func,bytes_arg):
+    """
+    This FUNCTION returns a function picking a stage's data input out of its arguments, from the
+    position or name of the argument (None = the stage has no data input file).
+    """
+    if bytes_arg is None:
+        return lambda args, kwargs: None
+    
+    params = list(inspect.signature(func).parameters)
+    if isinstance(bytes_arg, int):
+        if bytes_arg >= len(params):
+            return lambda args, kwargs: None
+        pos, name = bytes_arg, params[bytes_arg]
+    else:
+        pos, name = params.index(bytes_arg), bytes_arg
+    
+    def pick(args,kwargs):
+        if len(args) > pos:
+            return args[pos]
+        return kwargs.get(name)
+    return pick
+
+def Profile_Staged(func=None,bytes_arg=0):
+    """
+    This DECORATOR records every call of a function as a stage named after it while profiling is on.
+    Rows are taken from the result (or the first argument when the result has none) and bytes from
+    the size of the stage's data input file, by default its first argument when that is a file path
+    (other paths, e.g. style or calibration files, are not counted). A generator function is timed
+    only while it runs and its rows are summed over the blocks it yields.
+
+    Use as @Profile_Staged, or @Profile_Staged(bytes_arg=...) to pick the data input argument by
+    position or name (None = no bytes recorded).
+    """
+    if func is None:
+        return functools.partial(Profile_Staged, bytes_arg=bytes_arg)
+    name = func.__name__
+    data_input = _Profile_Input(func, bytes_arg)
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def wrapper(*args,**kwargs):
+            if not _Profile_On:
+                return func(*args, **kwargs)
+            return _Profile_Generator(name, func(*args, **kwargs), _Profile_Bytes(data_input(args, kwargs)))
+        return wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args,**kwargs):
+        if not _Profile_On:
+            return func(*args, **kwargs)
+        with _Profile_Run(name, None, _Profile_Bytes(data_input(args, kwargs))) as record:
+            result = func(*args, **kwargs)
+            rows = _Profile_Rows(result)
+            record['rows'] = rows if rows is not None or not args else _Profile_Rows(args[0])
+        return result
+
+    return wrapper
+
+def _Profile_Generator(name,gen,nbytes):
+    """
+    This FUNCTION re-yields the blocks of a generator stage, recording one stage for its whole run.
+    """
+    stack = getattr(_Profile_Local, 'stack', None)
+    record = {'stage': name, 'parent': stack[-1]['stage'] if stack else None,
+              'rows': 0, 'bytes': nbytes, 'time': 0.0, 'peak': None}
+    try:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                block = next(gen)
+            except StopIteration:
+                return
+            finally:
+                record['time'] += time.perf_counter() - t0
+            record['rows'] += _Profile_Rows(block) or 0
+            yield block
+    finally:
+        gen.close()
+        with _Profile_Lock:
+            _Profile_Records.append(record)
+
+#===============================================================================================
+# Report Functions
+#===============================================================================================
+
+def Profile_Records():
+    """
+    This FUNCTION returns a copy of every recorded stage call, in the order they finished.
+
+    OUTPUT:
+        records (List)          ->      One dictionary per stage call
+                                            'stage'  = stage name
+                                            'parent' = name of the stage it ran inside (None = top level)
+                                            'rows'   = rows processed (None = unknown)
+                                            'bytes'  = size of the input data file (None = unknown)
+                                            'time'   = wall time in [s] (includes stages run inside it)
+                                            'peak'   = peak allocated memory in [bytes] (None = not traced)
+    """
+    with _Profile_Lock:
+        return [dict(r) for r in _Profile_Records]
+
+def Profile_Summary():
+    """
+    This FUNCTION aggregates the recorded stage calls per stage name.
+
+    OUTPUT:
+        summary (List)          ->      One dictionary per stage, longest total time first
+                                            'stage', 'calls', 'time' (total [s]), 'mean' [s], 'max' [s],
+                                            'rows' (total), 'bytes' (total), 'peak' (largest [bytes]),
+                                            'rows_per_s'
+    """
+    stages = {}
+    for r in Profile_Records():
+        s = stages.setdefault(r['stage'], {'stage': r['stage'], 'calls': 0, 'time': 0.0, 'max': 0.0,
+                                           'rows': None, 'bytes': None, 'peak': None})
+        s['calls'] += 1
+        s['time'] += r['time']
+        s['max'] = max(s['max'], r['time'])
+        for key in ('rows', 'bytes'):
+            if r[key] is not None:
+                s[key] = (s[key] or 0) + r[key]
+        if r['peak'] is not None:
+            s['peak'] = max(s['peak'] or 0, r['peak'])
+
+    summary = sorted(stages.values(), key=lambda s: s['time'], reverse=True)
+    for s in summary:
+        s['mean'] = s['time'] / s['calls']
+        s['rows_per_s'] = s['rows'] / s['time'] if s['rows'] and s['time'] > 0 else None
+    return summary
+
+def Profile_Report(fmt='table',filepath=None):
+    """
+    This FUNCTION formats the stage summary as a text table or JSON, optionally writing it to a file.
+
+    INPUT:
+        fmt (String)            ->      'table' or 'json'
+        filepath (script)       ->      File the report is also written to (None = not written)
+
+    OUTPUT:
+        report (String)         ->      Formatted report
+    """
+    summary = Profile_Summary()
+
+    if fmt == 'json':
+        report = json.dumps({'stages': summary, 'records': Profile_Records()}, indent=2)
+    elif fmt == 'table':
+        lines = ["%-28s %6s %10s %10s %12s %10s %10s" % ("Stage", "Calls", "Total [s]", "Mean [s]",
+                                                         "Rows", "Read [MB]", "Peak [MB]")]
+        for s in summary:
+            lines.append("%-28s %6d %10.4f %10.4f %12s %10s %10s" % (s['stage'], s['calls'], s['time'], s['mean'],
+                         "-" if s['rows'] is None else s['rows'],
+                         "-" if s['bytes'] is None else "%.1f" % (s['bytes'] / 1e6),
+                         "-" if s['peak'] is None else "%.1f" % (s['peak'] / 1e6)))
+        report = "\n".join(lines)
+    else:
+        raise ValueError("Unknown report format '%s' (use 'table' or 'json')" % fmt)
+
+    if filepath is not None:
+        with open(filepath, 'w') as f:
+            f.write(report)
+    return report
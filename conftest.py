@@ -0,0 +1,42 @@
+#===============================================================================================
+# Test Configuration
+#===============================================================================================
+
+# Shared pytest fixtures for the tests in tests/. The repository root is put on sys.path by
+# pytest.ini, so the tests import the flat modules (DataExtracter, PlotFxns, ...) directly.
+
+# Imported Libraries
+import numpy as np
+import pytest
+
+#===============================================================================================
+# Fixtures
+#===============================================================================================
+
+@pytest.fixture
+def feather_log(tmp_path):
+    """
+    This FIXTURE returns a function writing a small feather board log: a header row, n_rows
+    complete rows (time in [ms]) and then last, e.g. a row cut mid line. Returns the file path.
+    """
+    def write(n_rows,last="",name="log.txt",newline="\n"):
+        t = np.arange(n_rows) * 10
+        rows = ["%d,%.3f,%.3f,%.3f,%.3f" % (ti, 200 + i % 7, 120.5, 60.25, 55.0) for i, ti in enumerate(t)]
+        path = tmp_path / name
+        with open(path, 'w', newline='') as f:
+            f.write(newline.join(["time,r1,r2,r3,r4"] + rows) + newline + last)
+        return str(path)
+    return write
+
+@pytest.fixture
+def plot_style(tmp_path):
+    """
+    This FIXTURE returns a function writing a small, fast matplotlib style file (no LaTeX, 100 dpi)
+    of the given figure size in [in]. Returns the file path.
+    """
+    def write(width=4,height=3,name="test.mplstyle"):
+        path = tmp_path / name
+        with open(path, 'w') as f:
+            f.write("figure.figsize : %g, %g\nfigure.dpi : 100\nsavefig.dpi : 100\ntext.usetex : False\n" % (width, height))
+        return str(path)
+    return write
@@ -0,0 +1,313 @@
+#===============================================================================================
+# DataExtracter Tests
+#===============================================================================================
+
+# Run from the repository root as:
+#   pytest tests
+
+# Imported Libraries
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+import DataExtracter as DE
+
+#===============================================================================================
+# Extraction Tests
+#===============================================================================================
+
+@pytest.mark.parametrize('last', ["", "12,-", "12,1e", "990,1.0,2.0,3.0,4.0,5,6,7", "990,1.0,2.0,3.0,4.0\n"])
+def test_StreamExtract_CutLastRow(feather_log,last):
+    path = feather_log(25, last)
+    expected = DE.Feather_DataExtract(path, 1)
+
+    blocks = list(DE.Feather_StreamExtract(path, 1, blocksize=4))
+
+    assert [len(b) for b in blocks[:-1]] == [4] * (len(blocks) - 1)
+    np.testing.assert_array_equal(np.concatenate(blocks), expected)
+
+def _Baseline_Parse(filepath):
+    # Line by line parse of the original B1/B2Feather_DataExtract, without calibration
+    with open(filepath) as f:
+        file = list(f)[1:-1]
+    return np.array([[float(x) for x in line.split(",")[:5]] for line in file]).reshape(-1, 5) / [1000, 1, 1, 1, 1]
+
+@pytest.mark.parametrize('newline', ["\n", "\r\n"])
+@pytest.mark.parametrize('last', ["", "990,201.0,12", "990,201.0,120.5,60.25,55.0\n"])
+def test_BulkParse_MatchesBaseline(feather_log,newline,last):
+    path = feather_log(30, last, newline=newline)
+
+    np.testing.assert_array_equal(DE.Feather_BulkParse(path), _Baseline_Parse(path))
+
+@pytest.mark.parametrize('board, cal', [
+    (1, lambda r: [(-0.00005)*r[1]**2 + 1.0496*r[1] - 7.0071, r[2], (-0.00001)*r[3]**2 + 1.0139*r[3] - 0.634, r[4]]),
+    (2, lambda r: [(-0.000006)*r[1]**2 + 1.0267*r[1] + (-14.281), r[2], (-0.00001)*r[3]**2 + 1.0139*r[3] - 0.634, r[4]])])
+def test_DataExtract_MatchesBaselineCalibration(feather_log,board,cal):
+    path = feather_log(30)
+    expected = np.array([[r[0]] + cal(r) for r in _Baseline_Parse(path)])
+
+    np.testing.assert_allclose(DE.Feather_DataExtract(path, board), expected, rtol=1e-12)
+
+def test_FeatherFollow_AppendedRows(feather_log):
+    path = feather_log(10, "100,201.0,12")                  # Last row still being written
+    follow = DE.Feather_Follow(path, 1, capacity=4)
+
+    assert follow.poll() == 10
+    assert follow.poll() == 0
+    with open(path, 'a') as f:
+        f.write("0.5,60.25,55.0\n")
+        f.write("".join("%d,%.3f,120.5,60.25,55.0\n" % (t, 200 + t % 7) for t in range(110, 200, 10)))
+
+    assert follow.poll() == 10
+    full = DE.Feather_DataExtract(path, 1)                  # Drops the last row, Follow keeps it
+    np.testing.assert_array_equal(follow.data[:-1], full)
+    assert follow.data[-1, 0] == 0.19
+
+#===============================================================================================
+# Cache Tests
+#===============================================================================================
+
+def _Write_Calibration(path,coeffs,version=1):
+    """
+    This FUNCTION writes a calibration config giving every channel of board 1 the same coefficients.
+    """
+    with open(path, 'w') as f:
+        json.dump({'version': version, 'boards': {'1': {str(ch): coeffs for ch in range(1, 5)}}}, f)
+    return str(path)
+
+def test_DataExtract_CacheMissOnNewCalibration(tmp_path,feather_log):
+    path = feather_log(25)
+    cachedir = str(tmp_path / "cache")
+    calib_a = _Write_Calibration(tmp_path / "a.json", [1.0, 0.0])
+    calib_b = _Write_Calibration(tmp_path / "b.json", [2.0, 0.0])       # Same version, other coefficients
+
+    data_a = np.array(DE.Feather_DataExtract(path, 1, calib_a, cachedir))
+    data_b = np.array(DE.Feather_DataExtract(path, 1, calib_b, cachedir))
+
+    np.testing.assert_allclose(data_b[:,1:], 2 * data_a[:,1:])
+    np.testing.assert_array_equal(DE.Feather_DataExtract(path, 1, calib_a, cachedir), data_a)
+
+def test_DataExtract_CacheMissOnEditedCalibration(tmp_path,feather_log):
+    path = feather_log(25)
+    cachedir = str(tmp_path / "cache")
+    calib = _Write_Calibration(tmp_path / "calib.json", [1.0, 0.0])
+    data_a = np.array(DE.Feather_DataExtract(path, 1, calib, cachedir))
+
+    _Write_Calibration(calib, [3.0, 0.0])
+    os.utime(calib, ns=(0, os.stat(calib).st_mtime_ns + 10**9))          # Ensure the edit is seen
+    data_b = DE.Feather_DataExtract(path, 1, calib, cachedir)
+
+    np.testing.assert_allclose(data_b[:,1:], 3 * data_a[:,1:])
+
+#===============================================================================================
+# DMA Tests
+#===============================================================================================
+
+def _Write_DMALog(path,n_rows,gap=None):
+    """
+    This FUNCTION writes a small DMA export, leaving the load of row gap empty.
+    """
+    lines = ["Points,Elapsed Time ,Scan Time ,Disp     ,Load   ,Temp  "]
+    for i in range(n_rows):
+        load = "" if i == gap else "%.3f" % (-5.0 - i)
+        lines.append("%d,%.1f,%.1f,%.4f,%s,25.0" % (i, 0.5*i, 0.5*i, 1.0 + 0.01*i, load))
+    with open(path, 'w', newline='') as f:
+        f.write("\n".join(lines) + "\n")
+    return str(path)
+
+@pytest.mark.parametrize('extract', [DE.DMA_Extract_TF, DE.DMA_Extract_TFD])
+@pytest.mark.parametrize('trange', [None, (3.0, 8.0)])
+def test_DMA_ColumnarKeepsRowLabels(tmp_path,extract,trange):
+    path = _Write_DMALog(tmp_path / "dma.csv", 40, gap=4)
+
+    data = extract(path, trange=trange)
+    columnar = extract(path, columnar=True, trange=trange)
+
+    np.testing.assert_array_equal(columnar.index, data.index)
+    np.testing.assert_allclose(columnar.to_numpy(), data.to_numpy())
+    assert columnar.loc[data.index[-1], 'Points'] == data.loc[data.index[-1], 'Points']
+
+#===============================================================================================
+# Campaign Tests
+#===============================================================================================
+
+def test_CampaignManifest_SampleNames(tmp_path):
+    for name in ("runs3_S4_B1.txt", "bad_S3_B2.txt", "S3.csv", "S4-run2.csv", "notes.txt", "Bs5_S12.txt"):
+        (tmp_path / name).write_text("")
+
+    samples = {e['sample']: e for e in DE.Campaign_Manifest(str(tmp_path))}
+
+    assert sorted(samples) == [3, 4, 12]
+    assert os.path.basename(samples[3]['feather']) == "bad_S3_B2.txt" and samples[3]['board'] == 2
+    assert os.path.basename(samples[4]['feather']) == "runs3_S4_B1.txt" and samples[4]['board'] == 1
+    assert os.path.basename(samples[4]['dma']) == "S4-run2.csv"
+    assert samples[12]['board'] is None
+
+def test_CampaignManifest_DuplicateSample(tmp_path):
+    for name in ("S3_B1.txt", "S3_B2.txt"):
+        (tmp_path / name).write_text("")
+
+    with pytest.raises(ValueError):
+        DE.Campaign_Manifest(str(tmp_path))
+
+#===============================================================================================
+# Filter Tests
+#===============================================================================================
+
+@pytest.mark.parametrize('t_start, duration', [(0.0, 0.5), (0.105, 0.2), (0.1, 0.1), (2.0, 1.0), (-1.0, 0.5)])
+def test_TimeWindow_MatchesTimeFilter(t_start,duration):
+    data = np.column_stack((np.arange(100) * 0.01, np.random.default_rng(0).random((100, 4))))
+
+    window = DE.Feather_timewindow(data, t_start, duration)
+
+    np.testing.assert_array_equal(window, DE.Feather_timefilter(data, t_start, duration))
+    assert window.size == 0 or np.shares_memory(window, data)
+
+def test_TimeWindow_ManyWindows():
+    data = np.column_stack((np.arange(100) * 0.01, np.zeros((100, 4))))
+
+    windows = DE.Feather_timewindow(data, [0.0, 0.2, 0.5], [0.1, 0.05, 0.3])
+
+    assert [len(w) for w in windows] == [11, 6, 31]
+
+#===============================================================================================
+# Cycle Tests
+#===============================================================================================
+
+def test_CycleIndex_Keys():
+    data = np.column_stack((np.arange(0, 10, 0.5), np.ones((20, 4))))
+    index = DE.Feather_CycleIndex(data, 1.0, 2.0, 3)
+
+    assert list(index) == [0, 1, 2]
+    assert 1 in index and np.int64(1) in index
+    assert 'x' not in index and 1.5 not in index and None not in index and 3 not in index
+    assert index.get('x') is None
+    assert np.shares_memory(index[1], data)
+
+def test_CycleMetrics_MatchesLoop():
+    t = np.arange(0, 10, 0.1)
+    t = t[(t < 4.0) | (t >= 6.0)]                   # No data in cycle 1
+    data = np.column_stack((t, np.random.default_rng(1).random((len(t), 4))))
+    cycles = DE.Feather_CycleIndex(data, 2.0, 2.0, 4)
+
+    metrics = DE.Feather_CycleMetrics(cycles, channels=(1, 3))
+
+    assert list(metrics.index) == [0, 2, 3]
+    for c, cycle in DE.Feather_cyclecut(data, 2.0, 2.0, 4).items():
+        row = metrics.loc[c]
+        assert row['Steps'] == len(cycle) and row['Time'] == cycle[0, 0]
+        for ch in (1, 3):
+            R = cycle[:, ch]
+            np.testing.assert_allclose([row['R%d Max' % ch], row['R%d Min' % ch], row['R%d Mean' % ch],
+                                        row['R%d Range' % ch], row['R%d Drift' % ch]],
+                                       [R.max(), R.min(), R.mean(), np.ptp(R), R[-1] - R[0]])
+
+def test_DMA_CycleDetect_StartTime():
+    t = np.arange(0, 30, 0.5)
+    load = (t % 10) * 2.0                           # Ramps 0 -> 19 every 10 s
+    data = pd.DataFrame({'Elapsed Time ': t, 'Load   ': load})
+
+    starts = DE.DMA_CycleDetect(data, threshold=5.0)
+
+    np.testing.assert_allclose(starts, [2.5, 12.5, 22.5])           # Crossing of 5.0, not the first sample above the band
+    np.testing.assert_allclose(DE.DMA_CycleDetect(data, threshold=5.2), [2.6, 12.6, 22.6])
+
+#===============================================================================================
+# Sync Tests
+#===============================================================================================
+
+def _Sync_Streams(t_start,sign=1.0):
+    # Feather resistance and DMA load following the same random (non periodic) load, offset by t_start
+    knots = np.random.default_rng(3).random(201)
+    def load(t):
+        return np.interp(t, np.arange(-20, 80.5, 0.5), knots)
+    t_fea = np.arange(0, 60, 0.03)
+    t_dma = np.arange(0, 40, 0.1)
+    data = np.column_stack((t_fea, 100 + sign * 5 * load(t_fea - t_start), np.zeros((len(t_fea), 3))))
+    dma = pd.DataFrame({'Elapsed Time ': t_dma, 'Load   ': load(t_dma)})
+    return data, dma
+
+def test_Resample_ChunksMatchInterp():
+    t_src = np.sort(np.random.default_rng(2).random(200)) * 10
+    t_dst = np.linspace(-1, 11, 500)
+    y_src = np.sin(t_src)
+
+    y_dst = DE.Sync_Resample(t_src, y_src, t_dst, chunksize=7)
+
+    np.testing.assert_allclose(y_dst, np.interp(t_dst, t_src, y_src, left=np.nan, right=np.nan))
+
+@pytest.mark.parametrize('base', ['dma', 'feather', 0.25])
+def test_DMA_Sync_CommonTimeBase(base):
+    t_fea = np.arange(0, 30, 0.03)
+    data = np.column_stack((t_fea, 2 * t_fea, 3 * t_fea, np.zeros((len(t_fea), 2))))
+    dma = pd.DataFrame({'Elapsed Time ': np.arange(-2, 40, 0.1), 'Load   ': np.arange(-2, 40, 0.1)})
+
+    time, resist, force = DE.Feather_DMA_Sync(data, dma, [1, 2], t_start=5.0, base=base)
+
+    assert time[0] >= -2 - 1e-9 and time[-1] <= 25 + 1e-9          # Span covered by both streams
+    np.testing.assert_allclose(resist, np.column_stack((2 * (time + 5.0), 3 * (time + 5.0))), atol=1e-9)
+    np.testing.assert_allclose(force, time, atol=1e-9)
+
+@pytest.mark.parametrize('t_start', [12.3, -4.71])
+@pytest.mark.parametrize('sign', [1.0, -1.0])                     # Resistance rising or dropping under load
+def test_LagEstimate_KnownShift(t_start,sign):
+    data, dma = _Sync_Streams(t_start, sign)
+
+    assert DE.Feather_LagEstimate(data, dma, 1) == pytest.approx(t_start, abs=0.02)
+
+def test_LagEstimate_MaxLag():
+    data, dma = _Sync_Streams(12.3)
+
+    assert abs(DE.Feather_LagEstimate(data, dma, 1, maxlag=10.0)) <= 10.0
+
+#===============================================================================================
+# Data Model Tests
+#===============================================================================================
+
+def test_FeatherRun_SlicesAreViews():
+    data = np.column_stack((np.arange(0, 10, 0.5), np.random.default_rng(0).normal(200, 1, (20, 4))))
+    run = DE.Feather_Run.from_array(data)
+
+    part = run[3:9]
+    window = DE.Feather_timewindow(run, 2.0, 3.0)
+    cycle = DE.Feather_CycleIndex(run, 1.0, 2.0, 3)[1]
+
+    for view in (part, window, cycle):
+        assert np.shares_memory(view.resist, run.resist) and np.shares_memory(view.time, run.time)
+    np.testing.assert_array_equal(window.to_array(), run.to_array()[4:11])
+    part[:,1] = 0.0
+    assert np.all(run[3:9, 1] == 0.0)
+
+def test_CampaignExtract_SparseWithBadFile(tmp_path,feather_log):
+    for name in ("S3_B1.txt", "S12_B2.txt"):
+        os.replace(feather_log(20 + len(name)), tmp_path / name)
+    (tmp_path / "S4_B1.txt").write_text("time,r1,r2,r3,r4\n0,abc,1,2,3\n10,1,2,3,4\n20,1,2,3,4\n")
+
+    campaign = DE.Campaign_Extract(str(tmp_path), workers=1)
+
+    assert campaign['samples'] == {0: 3, 1: 12}
+    assert list(campaign['feather']) == [0, 1]
+    assert len(campaign['feather'][1]) == 20 + len("S12_B2.txt") - 1
+    assert [os.path.basename(p) for p in campaign['errors']] == ["S4_B1.txt"]
+
+def test_FeatherRun_IntegerKey():
+    data = np.column_stack((np.arange(0, 10, 0.5), np.random.default_rng(0).normal(200, 1, (20, 4))))
+    run = DE.Feather_Run.from_array(data, dtype=np.float64)
+
+    np.testing.assert_array_equal(run[3], data[3])
+    np.testing.assert_array_equal(run[-1], data[-1])
+    with pytest.raises(IndexError):
+        run[20]
+
+def test_FileAtomic_FailedWriteLeavesNothing(tmp_path):
+    path = str(tmp_path / "out.txt")
+    with DE.File_Atomic(path) as tmppath, open(tmppath, 'w') as f:
+        f.write("first")
+    with pytest.raises(RuntimeError):
+        with DE.File_Atomic(path) as tmppath, open(tmppath, 'w') as f:
+            f.write("half")
+            raise RuntimeError("crash")
+    assert open(path).read() == "first"
+    assert os.listdir(tmp_path) == ["out.txt"]
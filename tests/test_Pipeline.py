@@ -0,0 +1,77 @@
+#===============================================================================================
+# Pipeline Tests
+#===============================================================================================
+
+# Run from the repository root as:
+#   pytest tests
+
+# Imported Libraries
+import json
+import os
+import shutil
+
+import DataExtracter as DE
+import Pipeline as PL
+
+#===============================================================================================
+# Helper Functions
+#===============================================================================================
+
+def _Write_Manifest(path,plots):
+    """
+    This FUNCTION writes a two sample manifest (the input files are not read by the graph functions).
+    """
+    samples = [{'sample': s, 'feather': "S%d_B1.txt" % s, 'board': 1, 'dma': "S%d.csv" % s,
+                'ch': 1, 't_start': 0.0, 'dur_cycle': 5.0, 'cyclecount': 3} for s in (1, 2)]
+    with open(path, 'w') as f:
+        json.dump({'output': "out", 'plots': plots, 'samples': samples}, f)
+    return str(path)
+
+#===============================================================================================
+# Graph Tests
+#===============================================================================================
+
+def test_Graph_PrunedToRequestedPlots(tmp_path):
+    graph = PL.Pipeline_Graph(PL.Pipeline_Manifest(_Write_Manifest(tmp_path / "m.json", ['RvT_raw_plot', 'RvT_comb_plot'])))
+
+    assert not any(node.startswith(("cycles/", "delta/", "dma/")) for node in graph)
+    assert {"raw/S1", "tfil/S2", "plot/RvT_raw_plot/S1", "plot/RvT_comb_plot"} <= set(graph)
+
+def test_Fingerprints_CalibrationFile(tmp_path,monkeypatch):
+    calib = tmp_path / "calib.json"
+    shutil.copy(DE.BaseCalibrationPath, calib)
+    monkeypatch.setattr(DE, 'BaseCalibrationPath', str(calib))
+    graph = PL.Pipeline_Graph(PL.Pipeline_Manifest(_Write_Manifest(tmp_path / "m.json", ['RvT_raw_plot'])))
+    before = PL.Pipeline_Fingerprints(graph)
+
+    with open(calib, 'a') as f:
+        f.write("\n")
+    os.utime(calib, ns=(0, os.stat(calib).st_mtime_ns + 10**9))
+    after = PL.Pipeline_Fingerprints(graph)
+
+    assert all(before[node] != after[node] for node in graph)
+
+def test_Fingerprints_PlotsDependOnDataExtracter(tmp_path,monkeypatch):
+    module = tmp_path / "DataExtracter.py"
+    shutil.copy(DE.__file__, module)
+    monkeypatch.setattr(DE, '__file__', str(module))
+    graph = {"plot/RvF_plot/S1": {'stage': 'plot', 'params': {}, 'files': [], 'deps': {}}}
+    before = PL.Pipeline_Fingerprints(graph)
+
+    os.utime(module, ns=(0, os.stat(module).st_mtime_ns + 10**9))
+    after = PL.Pipeline_Fingerprints(graph)
+
+    assert before != after
+
+def test_Fingerprints_CombPlotsReadOnlyTheirFields(tmp_path):
+    plots = ['RvT_combraw_plot', 'RvT_comb_plot', 'RvFvT_comb_plot']
+    manifest = PL.Pipeline_Manifest(_Write_Manifest(tmp_path / "m.json", plots))
+    before = PL.Pipeline_Fingerprints(PL.Pipeline_Graph(manifest))
+
+    manifest['samples'][1]['t_start'] = 2.0                     # Only the time filter reads t_start
+    manifest['samples'][1]['reason'] = "cracked"                # Only RvFvT_comb_plot prints reasons
+    after = PL.Pipeline_Fingerprints(PL.Pipeline_Graph(manifest))
+
+    assert before["plot/RvT_combraw_plot"] == after["plot/RvT_combraw_plot"]
+    assert before["plot/RvT_comb_plot"] != after["plot/RvT_comb_plot"]        # Through tfil/S2
+    assert before["plot/RvFvT_comb_plot"] != after["plot/RvFvT_comb_plot"]
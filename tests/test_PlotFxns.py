@@ -0,0 +1,215 @@
+#===============================================================================================
+# PlotFxns Tests
+#===============================================================================================
+
+# Run from the repository root as:
+#   pytest tests
+
+# Imported Libraries
+import os
+import numpy as np
+import pytest
+
+import PlotFxns as PF
+
+#===============================================================================================
+# Decimation Tests
+#===============================================================================================
+
+@pytest.mark.parametrize('n_points', [2, 3, 4, 5, 9, 100])
+@pytest.mark.parametrize('n', [10, 101, 5000])
+def test_Decimate_Size(n,n_points):
+    x = np.arange(n)
+    y = np.random.default_rng(n).normal(size=n)
+
+    xd, yd = PF.Plot_Decimate(x, y, n_points)
+
+    assert len(xd) <= max(n, n_points) and (n <= n_points or len(xd) <= n_points)
+    assert xd[0] == 0 and xd[-1] == n-1 and np.all(np.diff(xd) >= 0)
+    np.testing.assert_array_equal(yd, y[xd])
+    if n > n_points >= 4:
+        assert yd.max() == y.max() and yd.min() == y.min()      # Peaks are kept
+
+def test_Decimate_NonMonotonicX():
+    t = np.linspace(0, 20*np.pi, 5000)
+    x, y = np.sin(t), np.cos(t) + 0.01*t                  # Loops, as force vs displacement
+
+    xd, yd = PF.Plot_Decimate(x, y, 100)
+
+    np.testing.assert_array_equal(xd, x)
+    assert len(PF.Plot_Decimate(t, y, 100)[0]) <= 100 and len(PF.Plot_Decimate(-t, y, 100)[0]) <= 100
+
+def test_Decimate_PlotKeyword(tmp_path,plot_style,monkeypatch):
+    PF.matplotlib.use('Agg')
+    budgets = []
+    decimate = PF.Plot_Decimate
+    monkeypatch.setattr(PF, 'Plot_Decimate', lambda x, y, n_points=None: budgets.append(n_points) or decimate(x, y, n_points))
+    t = np.linspace(0, 10, 1000)
+
+    PF.RvT_raw_plot(t, np.sin(t), 1, "S1", str(tmp_path), stylepath=plot_style())
+    PF.RvT_raw_plot(t, np.sin(t), 1, "S1", str(tmp_path), stylepath=plot_style(), decimate=0)
+
+    assert budgets == [None, 0]
+
+def test_Decimate_TooFewPoints():
+    with pytest.raises(ValueError):
+        PF.Plot_Decimate(np.arange(10), np.arange(10), 1)
+
+#===============================================================================================
+# Batch Tests
+#===============================================================================================
+
+def _Job_RecordStyle(savepath,stylepath=PF.BaseStylePath):
+    """
+    Plot job stand-in that records the style it was given.
+    """
+    with open(savepath, 'w') as f:
+        f.write(str(stylepath))
+
+def test_Batch_Style(tmp_path):
+    jobs = [{'func': _Job_RecordStyle, 'args': (str(tmp_path / "a.txt"),)},
+            {'func': _Job_RecordStyle, 'args': (str(tmp_path / "b.txt"), "own.mplstyle")},
+            {'func': _Job_RecordStyle, 'kwargs': {'savepath': str(tmp_path / "c.txt"), 'stylepath': None}}]
+
+    results = PF.Plot_Batch(jobs, workers=1, stylepath=None)
+    assert all(r['ok'] for r in results)
+    assert (tmp_path / "a.txt").read_text() == PF.BaseStylePath
+
+    style = str(tmp_path / "batch.mplstyle")
+    with open(style, 'w') as f:
+        f.write("lines.linewidth: 2\n")
+    results = PF.Plot_Batch(jobs, workers=1, stylepath=style)
+    assert all(r['ok'] for r in results)
+    assert (tmp_path / "a.txt").read_text() == style
+    assert (tmp_path / "b.txt").read_text() == "own.mplstyle"
+    assert (tmp_path / "c.txt").read_text() == "None"
+
+#===============================================================================================
+# Writer Tests
+#===============================================================================================
+
+def _Same_Image(a,b):
+    return np.array_equal(PF.plt.imread(a), PF.plt.imread(b))
+
+def test_Writer_MatchesDirectSave(tmp_path,plot_style):
+    PF.matplotlib.use('Agg')
+    style = plot_style()
+    t = np.linspace(0, 10, 500)
+    data = {s: np.column_stack((t, 50 + 10*np.sin(t + s), np.zeros((500, 3)))) for s in range(2)}
+    testparam = {s: (1, 0.0, 2.0, 5) for s in range(2)}
+
+    def draw(out):
+        PF.RvT_raw_plot(t, 50 + np.sin(t), 1, "S1", out, stylepath=style)
+        PF.FvD_plot(t, np.cos(t), "S1", out, stylepath=style)
+        PF.RvT_comb_plot(data, testparam, out, stylepath=style, progressive=True)
+
+    draw(str(tmp_path / "direct"))
+    with PF.Plot_Writer(threads=2):
+        draw(str(tmp_path / "writer"))
+
+    names = [("RvT", "S1_RvT_raw_plot.png"), ("FvD", "S1_FvD_plot.png"),
+             ("RvT", "S1_RvT_comb_plot.png"), ("RvT", "S2_RvT_comb_plot.png")]
+    for subdir, name in names:
+        assert _Same_Image(PF.Plot_Path(str(tmp_path / "direct"), subdir, name),
+                           PF.Plot_Path(str(tmp_path / "writer"), subdir, name))
+
+def test_Writer_RaisesWriteErrors(tmp_path,plot_style):
+    PF.matplotlib.use('Agg')
+    (tmp_path / "Plots").write_text("")                         # A file where the output directory should be
+    t = np.linspace(0, 10, 50)
+
+    with pytest.raises(OSError):
+        with PF.Plot_Writer():
+            PF.RvT_raw_plot(t, t, 1, "S1", str(tmp_path), stylepath=plot_style())
+
+#===============================================================================================
+# Style and Cache Tests
+#===============================================================================================
+
+def test_Cache_StyleEditedInSession(tmp_path,plot_style):
+    PF.matplotlib.use('Agg')
+    style = plot_style(4, 3)
+    t = np.linspace(0, 10, 200)
+    out = PF.Plot_Path(str(tmp_path), "RvT", "S1_RvT_raw_plot.png")
+
+    with PF.Plot_Cache(str(tmp_path / "plotcache.json")) as cache:
+        PF.RvT_raw_plot(t, np.sin(t), 1, "S1", str(tmp_path), stylepath=style)
+        width = PF.plt.imread(out).shape[1]
+
+        plot_style(8, 3)                                        # Same file, wider figure
+        os.utime(style, ns=(0, os.stat(style).st_mtime_ns + 10**9))
+        PF.RvT_raw_plot(t, np.sin(t), 1, "S1", str(tmp_path), stylepath=style)
+
+    assert cache.misses == 2
+    assert PF.plt.imread(out).shape[1] > 1.5 * width
+
+#===============================================================================================
+# Template Tests
+#===============================================================================================
+
+@pytest.mark.parametrize('kind, func', [('RvT', lambda x, y, name, out, style: PF.RvT_raw_plot(x, y, 1, name, out, stylepath=style)),
+                                        ('FvD', lambda x, y, name, out, style: PF.FvD_plot(x, y, name, out, stylepath=style)),
+                                        ('DvT', lambda x, y, name, out, style: PF.DvT_plot(x, y, name, out, stylepath=style))])
+def test_Template_MatchesPlot(tmp_path,plot_style,kind,func):
+    PF.matplotlib.use('Agg')
+    style = plot_style()
+    t = np.linspace(0, 10, 500)
+    tpl_out, plot_out = str(tmp_path / "tpl"), str(tmp_path / "plot")
+
+    with PF.Plot_Template(kind, stylepath=style) as tpl:
+        tpl.render(t, 50 + 40 * np.sin(t), "S1", tpl_out)
+        tpl.render(2 * t, 5 + np.cos(t), "S2", tpl_out)           # Other limits than S1
+    func(2 * t, 5 + np.cos(t), "S2", plot_out, style)
+
+    name = os.listdir(PF.Plot_Path(plot_out, kind, ""))[0]
+    assert _Same_Image(PF.Plot_Path(tpl_out, kind, name), PF.Plot_Path(plot_out, kind, name))
+
+#===============================================================================================
+# Combined Plot Tests
+#===============================================================================================
+
+@pytest.mark.parametrize('plot', [PF.RvT_comb_plot, PF.RvT_combdelta_plot])
+def test_Comb_ProgressiveMatchesFullRenders(tmp_path,plot_style,plot):
+    PF.matplotlib.use('Agg')
+    style = plot_style()
+    t = np.linspace(0, 50, 400)
+    data = {s: np.column_stack((t + s, 50 + 10*np.sin(t + s), 60 + 5*np.cos(t*(s+1)), np.zeros((400, 2)))) for s in range(3)}
+    testparam = {s: (1 + s % 2, 0.0, 10.0, 5) for s in range(3)}
+
+    plot(data, testparam, str(tmp_path / "full"), stylepath=style)
+    plot(data, testparam, str(tmp_path / "prog"), stylepath=style, progressive=True)
+
+    names = sorted(os.listdir(PF.Plot_Path(str(tmp_path / "full"), "RvT", "")))
+    assert len(names) == 3 and names == sorted(os.listdir(PF.Plot_Path(str(tmp_path / "prog"), "RvT", "")))
+    for name in names:                                          # Same snapshots up to anti-aliasing
+        full = PF.plt.imread(PF.Plot_Path(str(tmp_path / "full"), "RvT", name))
+        prog = PF.plt.imread(PF.Plot_Path(str(tmp_path / "prog"), "RvT", name))
+        assert full.shape == prog.shape
+        assert np.abs(full - prog).mean() < 1e-3
+
+def test_Cache_HitMissClean(tmp_path,plot_style):
+    PF.matplotlib.use('Agg')
+    style = plot_style()
+    manifest = str(tmp_path / "plotcache.json")
+    t = np.linspace(0, 10, 200)
+    out = {n: PF.Plot_Path(str(tmp_path), "RvT", n + "_RvT_raw_plot.png") for n in ("S1", "S2")}
+
+    with PF.Plot_Cache(manifest) as cache:
+        for n in ("S1", "S2"):
+            PF.RvT_raw_plot(t, np.sin(t), 1, n, str(tmp_path), stylepath=style)
+    assert (cache.hits, cache.misses) == (0, 2)
+    mtime = os.stat(out["S1"]).st_mtime_ns
+
+    with PF.Plot_Cache(manifest) as cache:
+        PF.RvT_raw_plot(t, np.sin(t), 1, "S1", str(tmp_path), stylepath=style)         # Same inputs
+        PF.RvT_raw_plot(t, np.cos(t), 1, "S1", str(tmp_path), stylepath=style)         # New data
+        PF.RvT_raw_plot(t, np.cos(t), 1, "S1", str(tmp_path), stylepath=style, decimate=0)
+        assert cache.clean(dryrun=True) == [os.path.abspath(out["S2"])]                # S2 dropped from the report
+        assert cache.clean() == [os.path.abspath(out["S2"])]
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert os.stat(out["S1"]).st_mtime_ns != mtime and not os.path.exists(out["S2"])
+
+    os.remove(out["S1"])                                        # Missing output is redrawn
+    with PF.Plot_Cache(manifest) as cache:
+        PF.RvT_raw_plot(t, np.cos(t), 1, "S1", str(tmp_path), stylepath=style, decimate=0)
+    assert (cache.hits, cache.misses) == (0, 1) and os.path.exists(out["S1"])
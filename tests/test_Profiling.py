@@ -0,0 +1,59 @@
+#===============================================================================================
+# Profiling Tests
+#===============================================================================================
+
+# Run from the repository root as:
+#   pytest tests
+
+# Imported Libraries
+import os
+import tracemalloc
+import numpy as np
+
+import Profiling as PR
+import DataExtracter as DE
+
+#===============================================================================================
+# Stage Tests
+#===============================================================================================
+
+@PR.Profile_Staged
+def _Stage_Read(filepath,stylepath):
+    return np.zeros(3)
+
+@PR.Profile_Staged(bytes_arg='source')
+def _Stage_Named(config,source=None):
+    return None
+
+def test_Staged_BytesOfDataInputOnly(tmp_path,feather_log):
+    data, style = tmp_path / "data.txt", tmp_path / "style.mplstyle"
+    data.write_bytes(b"x" * 100)
+    style.write_bytes(b"y" * 7)
+
+    with PR.Profile_Session():
+        _Stage_Read(str(data), str(style))
+        _Stage_Read(np.zeros(2), str(style))
+        _Stage_Named(str(style), source=str(data))
+        DE.Feather_DataExtract(feather_log(20), 1)
+    records = {(r['stage'], r['bytes']) for r in PR.Profile_Records()}
+
+    assert ('_Stage_Read', 100) in records and ('_Stage_Read', None) in records
+    assert ('_Stage_Named', 100) in records
+    assert ('Feather_DataExtract', os.path.getsize(tmp_path / "log.txt")) in records     # Calibration file not counted
+
+#===============================================================================================
+# Control Tests
+#===============================================================================================
+
+def test_Disable_KeepsCallersTracing():
+    tracemalloc.start()
+    try:
+        with PR.Profile_Session(memory=True):
+            pass
+        assert tracemalloc.is_tracing()                     # Started by the caller, left running
+    finally:
+        tracemalloc.stop()
+
+    with PR.Profile_Session(memory=True):
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()                     # Started by Profile_Enable, stopped